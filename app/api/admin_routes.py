@@ -1,30 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Header
-from app.settings import settings
-from app.store.session_repo import load_session
+import heapq
+from itertools import islice
+from typing import Optional
+
+from fastapi import APIRouter, Depends
+from app.api.auth import require_admin
+from app.store.session_repo import load_session, load_session_fields, load_session_cached
 from app.store.redis_conn import get_redis
 import app.observability.metrics as metrics
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-def require_admin(x_admin_key: str = Header(default="", alias="x-admin-key")):
-    if not settings.ADMIN_RBAC_ENABLED:
-        return
-    # Secure default: if enabled but no key configured, reject all.
-    if not settings.ADMIN_API_KEY:
-        raise HTTPException(status_code=403, detail="Admin access disabled (no key configured)")
-    if x_admin_key != settings.ADMIN_API_KEY:
-        raise HTTPException(status_code=403, detail="Invalid admin key")
-
 @router.get("/session/{session_id}")
 def get_session_snapshot(session_id: str, _=Depends(require_admin)):
     """Compact session snapshot for admin dashboard."""
-    s = load_session(session_id)
+    s = load_session_cached(session_id, loader=load_session)
+    # SessionState is a dataclass: every field below exists with a typed default,
+    # so read attributes directly instead of getattr(..., default) + coercion.
     # CQ: Questions asked, relevant, redflags, elicitation
     cq = {
-        "questionsAsked": int(getattr(s, "cqQuestionsAsked", 0) or 0),
-        "relevantQuestions": int(getattr(s, "cqRelevantQuestions", 0) or 0),
-        "redFlagMentions": int(getattr(s, "cqRedFlagMentions", 0) or 0),
-        "elicitationAttempts": int(getattr(s, "cqElicitationAttempts", 0) or 0),
+        "questionsAsked": s.cqQuestionsAsked,
+        "relevantQuestions": s.cqRelevantQuestions,
+        "redFlagMentions": s.cqRedFlagMentions,
+        "elicitationAttempts": s.cqElicitationAttempts,
     }
     
     return {
@@ -32,62 +29,89 @@ def get_session_snapshot(session_id: str, _=Depends(require_admin)):
         "state": s.state,
         "scamDetected": bool(s.scamDetected),
         "scamType": s.scamType or "UNKNOWN",
-        "confidence": float(getattr(s, "confidence", 0.0) or 0.0),
+        "confidence": s.confidence,
         "finalizedAt": s.finalizedAt,
         "reportId": s.reportId,
         "callbackStatus": s.callbackStatus,
         "cq": cq,
         "outboxLedger": s.outboxEntry or {},
-        "turnsEngaged": int(getattr(s, "turnsEngaged", 0) or 0),
-        "durationSec": int(getattr(s, "engagementDurationSeconds", 0) or 0),
+        "turnsEngaged": s.turnsEngaged,
+        "durationSec": s.engagementDurationSeconds,
     }
 
-@router.get("/session/{session_id}/timeline")
-def get_session_timeline(session_id: str, _=Depends(require_admin)):
-    """Ordered event stream for the session."""
-    s = load_session(session_id)
-    events = []
-    
-    # Conversation events
-    for m in s.conversation or []:
-        events.append({
+def _finalize_reason(notes: Optional[str]) -> str:
+    """Value of the last `finalize_reason=` marker in agentNotes (single right-to-left scan)."""
+    _head, sep, tail = (notes or "").rpartition("finalize_reason=")
+    return tail.split("|", 1)[0].strip() if sep else "unknown"
+
+
+def _event_ts(ev: dict) -> int:
+    return int(ev.get("timestamp", 0) or 0)
+
+
+def _message_events(items, event_type: str, ignored: bool = False):
+    """Lazily shape stored messages into timeline events, ordered by timestamp."""
+    # sorted() is ~O(N) on the already-appended-in-order lists; it only does real work
+    # when client timestamps arrive out of order.
+    for m in sorted(items or [], key=_event_ts):
+        ev = {
             "timestamp": m.get("timestamp"),
-            "type": "message",
+            "type": event_type,
             "sender": m.get("sender"),
-            "content": m.get("text")
-        })
-        
-    # Postscript events (latched)
-    for p in s.postscript or []:
-         events.append({
-            "timestamp": p.get("timestamp"),
-            "type": "postscript_message",
-            "sender": p.get("sender"),
-            "content": p.get("text"),
-            "ignored": True
-         })
-    
+            "content": m.get("text"),
+        }
+        if ignored:
+            ev["ignored"] = True
+        yield ev
+
+
+@router.get("/session/{session_id}/timeline")
+def get_session_timeline(
+    session_id: str,
+    limit: Optional[int] = None,
+    after_ts: Optional[int] = None,
+    _=Depends(require_admin),
+):
+    """
+    Ordered event stream for the session.
+    Optional pagination: `after_ts` skips events at/before that epoch-ms timestamp,
+    `limit` caps the number of events returned.
+    """
+    s = load_session_cached(session_id, loader=load_session)
+
+    streams = [
+        # Conversation events
+        _message_events(s.conversation, "message"),
+        # Postscript events (latched)
+        _message_events(s.postscript, "postscript_message", ignored=True),
+    ]
+
     # Finalization event
     if s.finalizedAt:
-        events.append({
+        streams.append([{
             "timestamp": s.finalizedAt,
             "type": "lifecycle_finalized",
             "reportId": s.reportId,
-            "reason": (s.agentNotes or "").split("|")[-1].strip() if "finalize_reason=" in (s.agentNotes or "") else "unknown"
-        })
-        
-    # Sort by timestamp
-    return sorted(events, key=lambda x: int(x.get("timestamp", 0) or 0))
+            "reason": _finalize_reason(s.agentNotes),
+        }])
+
+    # Merge the per-source ordered streams by timestamp (stable across sources)
+    events = heapq.merge(*streams, key=_event_ts)
+    if after_ts is not None:
+        events = (e for e in events if _event_ts(e) > int(after_ts))
+    if limit is not None:
+        events = islice(events, max(0, int(limit)))
+    return list(events)
 
 @router.get("/callbacks")
 def get_callbacks(session_id: str, _=Depends(require_admin)):
     """View the idempotency ledger for a session."""
-    s = load_session(session_id)
+    s = load_session_fields(session_id, ("callbackStatus", "outboxEntry", "finalReport"))
     return {
         "sessionId": session_id,
-        "callbackStatus": s.callbackStatus,
-        "outboxLedger": s.outboxEntry or {},
-        "finalReportPreview": s.finalReport
+        "callbackStatus": s["callbackStatus"],
+        "outboxLedger": s["outboxEntry"] or {},
+        "finalReportPreview": s["finalReport"]
     }
 
 @router.get("/slo")
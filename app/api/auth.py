@@ -1,6 +1,13 @@
+from hmac import compare_digest
+
 from fastapi import Header, HTTPException
 from app.settings import settings
 
+# Single home for request-auth dependencies (public API key + admin RBAC).
+# Settings are read per call (plain attribute reads) so runtime overrides apply.
+# Keys are compared as UTF-8 bytes with hmac.compare_digest (constant time; it rejects
+# non-ASCII str), and never cached: a memo would compare and time the header outside it.
+
 
 def require_api_key(x_api_key: str = Header(default="", alias="x-api-key")):
     """
@@ -8,7 +15,17 @@ def require_api_key(x_api_key: str = Header(default="", alias="x-api-key")):
     - If API_KEY env is empty: allow all requests.
     - If API_KEY env is set: require matching x-api-key header.
     """
-    if not getattr(settings, "API_KEY", ""):
-        return
-    if x_api_key != settings.API_KEY:
+    api_key = settings.API_KEY
+    if api_key and not compare_digest(x_api_key.encode("utf-8"), api_key.encode("utf-8")):
         raise HTTPException(status_code=401, detail="Invalid API key")
+
+
+def require_admin(x_admin_key: str = Header(default="", alias="x-admin-key")):
+    if not settings.ADMIN_RBAC_ENABLED:
+        return
+    admin_key = settings.ADMIN_API_KEY
+    # Secure default: if enabled but no key configured, reject all.
+    if not admin_key:
+        raise HTTPException(status_code=403, detail="Admin access disabled (no key configured)")
+    if not compare_digest(x_admin_key.encode("utf-8"), admin_key.encode("utf-8")):
+        raise HTTPException(status_code=403, detail="Invalid admin key")
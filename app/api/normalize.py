@@ -1,5 +1,12 @@
 import time
 
+_DEFAULT_SENDER = "scammer"
+
+
+def _now_ms() -> int:
+    # Integer-only clock read (no float multiply)
+    return time.time_ns() // 1_000_000
+
 
 def normalize_honeypot_payload(payload: dict) -> dict:
     """
@@ -16,9 +23,28 @@ def normalize_honeypot_payload(payload: dict) -> dict:
     if payload is None:
         payload = {}
 
+    # Fast path: canonical shape (the vast majority of real traffic) skips the
+    # variant-fallback chains below; output is identical to the slow path.
+    msg = payload.get("message")
+    session_id = payload.get("sessionId")
+    if session_id and isinstance(msg, dict):
+        sender = msg.get("sender")
+        text = msg.get("text")
+        if sender and text:
+            return {
+                "sessionId": session_id,
+                "message": {
+                    "sender": sender,
+                    "text": text,
+                    "timestamp": msg.get("timestamp") or payload.get("timestamp") or _now_ms(),
+                },
+                "conversationHistory": payload.get("conversationHistory") or payload.get("history") or [],
+                "metadata": payload.get("metadata") or {},
+            }
+
     # sessionId variants
     session_id = (
-        payload.get("sessionId")
+        session_id
         or payload.get("session_id")
         or payload.get("session")
         or payload.get("id")
@@ -26,28 +52,26 @@ def normalize_honeypot_payload(payload: dict) -> dict:
     )
 
     # message variants
-    msg = payload.get("message")
-
     if isinstance(msg, str):
         # If tester sends message as a plain string
         msg = {
-            "sender": "scammer",
+            "sender": _DEFAULT_SENDER,
             "text": msg,
-            "timestamp": int(time.time() * 1000),
+            "timestamp": _now_ms(),
         }
     elif not isinstance(msg, dict):
         # If tester sends text at top-level
         text = payload.get("text") or payload.get("messageText") or payload.get("content") or ""
         msg = {
-            "sender": payload.get("sender", "scammer"),
+            "sender": payload.get("sender", _DEFAULT_SENDER),
             "text": text,
-            "timestamp": int(time.time() * 1000),
+            "timestamp": _now_ms(),
         }
 
     # Fill defaults
-    sender = msg.get("sender") or payload.get("sender") or "scammer"
+    sender = msg.get("sender") or payload.get("sender") or _DEFAULT_SENDER
     text = msg.get("text") or msg.get("message") or payload.get("text") or ""
-    timestamp = msg.get("timestamp") or payload.get("timestamp") or int(time.time() * 1000)
+    timestamp = msg.get("timestamp") or payload.get("timestamp") or _now_ms()
 
     # conversationHistory variants
     conversation_history = payload.get("conversationHistory") or payload.get("history") or []
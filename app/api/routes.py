@@ -1,7 +1,7 @@
-import json
 from typing import Any
 
-from fastapi import APIRouter, Depends, Body, Request
+from fastapi import APIRouter, Depends, Body, Request, Response
+from pydantic import TypeAdapter
 from starlette.concurrency import run_in_threadpool
 
 from app.api.schemas import HoneypotRequest, HoneypotResponse
@@ -11,6 +11,8 @@ from app.api.normalize import normalize_honeypot_payload
 from app.settings import settings
 from app.intel.artifact_registry import snapshot_intent_map, reload_intent_map
 from app.store.redis_conn import get_redis
+from app.store.session_repo import invalidate_cached_session
+from app.utils import jsonfast
 
 router = APIRouter()
 
@@ -20,9 +22,32 @@ COMPAT_POST_PATHS = (
     "/detect",           # evaluator example path style
     "/api/detect",       # extra safety
 )
+CANONICAL_PATH = COMPAT_POST_PATHS[0]
+_PATH_ALIASES = {p: CANONICAL_PATH for p in COMPAT_POST_PATHS[1:]}
 
+# Built once at import; reused for every honeypot POST instead of class-level dispatch.
+_HR_ADAPTER = TypeAdapter(HoneypotRequest)
 
-async def _handle_honeypot(request: Request, payload: Any) -> HoneypotResponse:
+
+class CompatPathMiddleware:
+    """
+    Pure-ASGI middleware that rewrites alias paths (/honeypot, /detect, /api/detect)
+    to the canonical /api/honeypot before routing, so each handler is registered once
+    instead of once per alias (one dict lookup vs. extra route matchers per request).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            target = _PATH_ALIASES.get(scope["path"])
+            if target is not None:
+                scope = dict(scope, path=target, raw_path=target.encode("ascii"))
+        await self.app(scope, receive, send)
+
+
+async def _handle_honeypot(request: Request, payload: Any) -> Response:
     """Accept ANY payload (or no payload) and normalize into HoneypotRequest."""
 
     # If body missing or couldn't be parsed into payload, try reading it manually
@@ -40,55 +65,76 @@ async def _handle_honeypot(request: Request, payload: Any) -> HoneypotResponse:
             payload = {}
 
     normalized = normalize_honeypot_payload(payload)
-    req = HoneypotRequest.model_validate(normalized)
+    req = _HR_ADAPTER.validate_python(normalized, strict=False)
+    # handle_event is never CPU-light: every path (including latched FINALIZED sessions)
+    # takes the Redis session lock and loads/saves the session with the sync client,
+    # so it must stay off the event loop. A no-op fast path would skip persistence.
     out = await run_in_threadpool(handle_event, req)
 
     reply_val = ""
     if isinstance(out, tuple) and len(out) == 1:
         out = out[0]
     if isinstance(out, dict):
-        reply_val = out.get("reply") or ""
+        reply_val = str(out.get("reply") or "")
     elif isinstance(out, str):
         reply_val = out
     else:
         reply_val = str(out)
 
-    return HoneypotResponse(status="success", reply=reply_val)
+    # Returning a Response directly bypasses response_model validation/serialization;
+    # the route keeps response_model=HoneypotResponse for the OpenAPI schema.
+    return _success_response(reply_val)
+
+
+# The success envelope is fixed; only the reply varies. Splice the JSON-encoded reply
+# into a prebuilt prefix instead of building a model/dict and encoding it per request.
+_SUCCESS_PREFIX = b'{"status":"success","reply":'
+
+
+def _success_body(reply: str) -> bytes:
+    return _SUCCESS_PREFIX + jsonfast.dumps(reply) + b"}"
+
 
+def _success_response(reply: str) -> Response:
+    return Response(content=_success_body(reply), media_type="application/json")
 
-def _ping_reply() -> HoneypotResponse:
-    # Safe “ping” response for GET requests; does not start a session.
-    # The evaluator submission expects a publicly accessible endpoint and a stable JSON response.
-    return HoneypotResponse(
-        status="success",
-        reply="Honeypot API is running. Send a POST request with {sessionId, message, conversationHistory, metadata}."
-    )
+
+# Safe “ping” response for GET requests; does not start a session.
+# The evaluator submission expects a publicly accessible endpoint and a stable JSON response.
+# The body never changes, so it is serialized once at import; returning a Response
+# directly also lets FastAPI skip response_model validation on liveness probes.
+_PING_BYTES = _success_body(
+    "Honeypot API is running. Send a POST request with {sessionId, message, conversationHistory, metadata}."
+)
+
+
+def _ping_reply() -> Response:
+    return Response(content=_PING_BYTES, media_type="application/json")
 
 
 # ---------------------------------------------------------------------------
-# POST endpoints: accept compatible paths (submission/tooling variance)
+# POST endpoint: alias paths (submission/tooling variance) are rewritten to the
+# canonical path by CompatPathMiddleware
 # ---------------------------------------------------------------------------
-for _path in COMPAT_POST_PATHS:
-    @router.post(
-        _path,
-        response_model=HoneypotResponse,
-        dependencies=[Depends(require_api_key)],
-    )
-    async def honeypot_post(request: Request, payload: Any = Body(None)):  # type: ignore
-        return await _handle_honeypot(request, payload)
+@router.post(
+    CANONICAL_PATH,
+    response_model=HoneypotResponse,
+    dependencies=[Depends(require_api_key)],
+)
+async def honeypot_post(request: Request, payload: Any = Body(None)):
+    return await _handle_honeypot(request, payload)
 
 
 # ---------------------------------------------------------------------------
-# GET endpoints: respond with a stable payload (no session creation)
+# GET endpoint: respond with a stable payload (no session creation)
 # ---------------------------------------------------------------------------
-for _path in COMPAT_POST_PATHS:
-    @router.get(
-        _path,
-        response_model=HoneypotResponse,
-        dependencies=[Depends(require_api_key)],
-    )
-    async def honeypot_get():  # type: ignore
-        return _ping_reply()
+@router.get(
+    CANONICAL_PATH,
+    response_model=HoneypotResponse,
+    dependencies=[Depends(require_api_key)],
+)
+async def honeypot_get():
+    return _ping_reply()
 
 
 # ✅ Root alias (some endpoint testers keep calling only /)
@@ -127,6 +173,7 @@ def debug_intent_map(_=Depends(require_api_key)):
 def debug_intent_map_reload(_=Depends(require_api_key)):
     """Forces an in-process reload from Redis (useful after seeding)."""
     keys, ts = reload_intent_map()
+    invalidate_cached_session()
     return {"reloadedKeys": keys, "reloadedAtEpoch": ts}
 
 
@@ -141,6 +188,6 @@ def debug_last_callback_payload(session_id: str, _=Depends(require_api_key)):
     try:
         r = get_redis()
         raw = r.get(f"session:{session_id}:last_callback_payload")
-        return {"sessionId": session_id, "payload": (raw and json.loads(raw)) or None}
+        return {"sessionId": session_id, "payload": (raw and jsonfast.loads(raw)) or None}
     except Exception:
         return {"sessionId": session_id, "payload": None}
@@ -0,0 +1,110 @@
+"""
+Batched Final Output Sender (Flat-Combining)
+--------------------------------------------
+Why: under load, many request threads finalize at once and each one runs its own
+outbox attempt (lease SET, session GET, POST, ledger write) against Redis.
+Goal: request threads publish (session_id, body) and wait; a single combiner thread
+drains whatever arrived within a short window and runs the batch through
+process_outbox_batch, so leases and session loads cost one Redis round-trip per
+batch and the POSTs share the pooled HTTP client concurrently.
+
+Enabled by CALLBACK_BATCH_WINDOW_MS > 0 (see sender.send_final_result_sync).
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from app.callback.outbox import process_outbox_batch
+from app.observability.logging import log
+from app.settings import settings
+
+
+class _Request:
+    __slots__ = ("session_id", "body", "backoff_ms", "done", "result")
+
+    def __init__(self, session_id: str, body: Optional[bytes], backoff_ms: Optional[int] = None):
+        self.session_id = session_id
+        self.body = body
+        self.backoff_ms = backoff_ms
+        self.done = threading.Event()
+        self.result = False
+
+
+class BatchSender:
+    """Per-process combiner: one daemon thread owns draining and dispatch."""
+
+    def __init__(self, window_ms: int, max_batch: int = 32, max_workers: int = 8):
+        self.window_sec = max(0, int(window_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        # Bounded: producers block (then time out) instead of growing an unbounded backlog
+        self._requests: "queue.Queue[_Request]" = queue.Queue(maxsize=self.max_batch * 8)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cb-batch-send")
+        self._thread = threading.Thread(target=self._run, name="cb-batch-combiner", daemon=True)
+        self._thread.start()
+
+    def submit(self, session_id: str, body: Optional[bytes] = None, timeout: float = 8.0, backoff_ms: Optional[int] = None) -> bool:
+        """
+        Publish one delivery and wait up to `timeout` seconds for its batch.
+        `backoff_ms` is passed through as process_outbox_entry's retry backoff override.
+        Returns process_outbox_entry's result, or False on timeout (the ledger then
+        stays 'pending' and the RQ fallback picks it up).
+        """
+        req = _Request(session_id, body, backoff_ms)
+        deadline = time.monotonic() + timeout
+        try:
+            self._requests.put(req, timeout=timeout)
+        except queue.Full:
+            return False
+        req.done.wait(max(0.0, deadline - time.monotonic()))
+        return req.result
+
+    def _collect(self) -> list:
+        batch = [self._requests.get()]
+        closes_at = time.monotonic() + self.window_sec
+        while len(batch) < self.max_batch:
+            remaining = closes_at - time.monotonic()
+            try:
+                batch.append(self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            try:
+                results = process_outbox_batch(
+                    [(r.session_id, r.body) for r in batch],
+                    executor=self._executor,
+                    backoff_ms={r.session_id: r.backoff_ms for r in batch if r.backoff_ms is not None},
+                )
+            except Exception as e:
+                log(event="callback_batch_exception", size=len(batch), error=str(e))
+                results = {}
+            for req in batch:
+                req.result = bool(results.get(req.session_id, False))
+                req.done.set()
+            log(event="callback_batch_flushed", size=len(batch))
+
+
+_SENDER: Optional[BatchSender] = None
+_SENDER_LOCK = threading.Lock()
+
+
+def get_batch_sender() -> BatchSender:
+    global _SENDER
+    sender = _SENDER
+    if sender is not None:
+        return sender
+    with _SENDER_LOCK:
+        if _SENDER is None:
+            _SENDER = BatchSender(
+                window_ms=int(settings.CALLBACK_BATCH_WINDOW_MS),
+                max_batch=int(settings.CALLBACK_BATCH_MAX),
+            )
+        return _SENDER
@@ -1,12 +1,63 @@
+import atexit
 import httpx
+import threading
 import time
-from typing import Dict, Tuple, Any, Optional
+from typing import Dict, Tuple, Any, Optional, Union
 from app.settings import settings
+from app.utils import jsonfast
 from app.observability.logging import log
 
-def send_final_result_http(payload: Dict[str, Any], headers: Dict[str, str], timeout: float = 5.0) -> Tuple[bool, int, Optional[str]]:
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx when installed: httpx[http2])
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+# Shared pooled client: keep-alive connections are reused across callbacks, so retries
+# and back-to-back finalizations skip the TCP/TLS handshake. Timeout is set per request.
+# Created on first send (not at import), so processes that only import this module never
+# build the TLS context, and an RQ work-horse builds its own after the fork.
+_CLIENT: Optional[httpx.Client] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _get_client() -> httpx.Client:
+    global _CLIENT
+    client = _CLIENT
+    if client is not None:
+        return client
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = httpx.Client(
+                timeout=float(settings.CALLBACK_TIMEOUT_SEC),
+                http2=_HTTP2,
+                limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+            )
+            atexit.register(_CLIENT.close)
+        return _CLIENT
+
+_ERROR_EXCERPT_BYTES = 512
+
+
+def _error_excerpt(resp: httpx.Response) -> str:
     """
-    Pure HTTP sender for the final report.
+    Short excerpt of a failed response body for error messages. Slices the raw bytes
+    before decoding so a multi-MB error page is never decoded into one large str.
+    """
+    try:
+        return resp.content[:_ERROR_EXCERPT_BYTES].decode("utf-8", "replace")
+    except Exception:
+        return ""
+
+
+def _body(payload: Union[Dict[str, Any], bytes]) -> bytes:
+    """Wire body: pre-serialized bytes pass through; dicts are serialized once here."""
+    return payload if isinstance(payload, bytes) else jsonfast.dumps(payload)
+
+
+def send_final_result_http(payload: Union[Dict[str, Any], bytes], headers: Dict[str, str], timeout: float = 5.0) -> Tuple[bool, int, Optional[str]]:
+    """
+    Pure HTTP sender for the final report (a dict, or its already-serialized JSON bytes).
     Returns (success, status_code, error_message).
     Does NOT handle persistence, retries, or ledger updates.
     """
@@ -14,13 +65,12 @@ def send_final_result_http(payload: Dict[str, Any], headers: Dict[str, str], tim
         return False, 0, "No callback URL configured"
 
     try:
-        with httpx.Client(timeout=timeout) as client:
-            resp = client.post(settings.GUVI_CALLBACK_URL, json=payload, headers=headers)
-            
-            if 200 <= resp.status_code < 300:
-                return True, resp.status_code, None
-            
-            return False, resp.status_code, f"HTTP {resp.status_code}: {resp.text[:200]}"
+        resp = _get_client().post(settings.GUVI_CALLBACK_URL, content=_body(payload), headers={"Content-Type": "application/json", **headers}, timeout=timeout)
+
+        if 200 <= resp.status_code < 300:
+            return True, resp.status_code, None
+
+        return False, resp.status_code, f"HTTP {resp.status_code}: {_error_excerpt(resp)}"
 
     except Exception as e:
         return False, 0, str(e)
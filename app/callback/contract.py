@@ -27,19 +27,24 @@ EI_LIST_KEYS = (
     "policyNumbers",
     "orderNumbers",
 )
+EI_LIST_KEYS_SET = frozenset(EI_LIST_KEYS)
 
 
-def _as_bool(v: Any) -> bool:
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "y"))
+
+
+# Generic converters: handle any type (subclasses, exotic scalars) via isinstance chains.
+def _as_bool_any(v: Any) -> bool:
     if isinstance(v, bool):
         return v
     if isinstance(v, (int, float)):
         return bool(v)
     if isinstance(v, str):
-        return v.strip().lower() in ("true", "1", "yes", "y")
+        return v.strip().lower() in _TRUE_STRINGS
     return False
 
 
-def _as_int(v: Any, default: int = 0) -> int:
+def _as_int_any(v: Any, default: int = 0) -> int:
     try:
         if v is None:
             return int(default)
@@ -60,7 +65,7 @@ def _as_int(v: Any, default: int = 0) -> int:
         return int(default)
 
 
-def _as_float(v: Any, default: float = 0.0) -> float:
+def _as_float_any(v: Any, default: float = 0.0) -> float:
     try:
         if v is None:
             return float(default)
@@ -76,7 +81,7 @@ def _as_float(v: Any, default: float = 0.0) -> float:
         return float(default)
 
 
-def _as_list(v: Any) -> List[str]:
+def _as_list_any(v: Any) -> List[str]:
     if v is None:
         return []
     if isinstance(v, list):
@@ -88,6 +93,97 @@ def _as_list(v: Any) -> List[str]:
     return []
 
 
+# Fast paths keyed on the exact type (one dict lookup instead of an isinstance chain)
+# for the JSON-native types that make up nearly all payload values. A converter
+# returning None means "use the default". Anything else goes to the *_any versions.
+def _float_to_int(v: float) -> int:
+    return int(v) if v.is_integer() else int(round(v))
+
+def _str_to_int(v: str):
+    s = v.strip()
+    return int(float(s)) if s else None
+
+def _str_to_float(v: str):
+    s = v.strip()
+    return float(s) if s else None
+
+def _clean_list(v: list) -> List[str]:
+    # Same as [str(x) for x in v if str(x).strip()], converting each item only once
+    out = []
+    for x in v:
+        s = x if type(x) is str else str(x)
+        if s.strip():
+            out.append(s)
+    return out
+
+def _scalar_to_list(v) -> List[str]:
+    s = str(v).strip()
+    return [s] if s else []
+
+_BOOL_BY_TYPE = {
+    bool: bool,
+    int: bool,
+    float: bool,
+    str: lambda v: v.strip().lower() in _TRUE_STRINGS,
+    type(None): bool,
+}
+_INT_BY_TYPE = {
+    bool: int,
+    int: int,
+    float: _float_to_int,
+    str: _str_to_int,
+    type(None): lambda v: None,
+}
+_FLOAT_BY_TYPE = {
+    bool: float,
+    int: float,
+    float: float,
+    str: _str_to_float,
+    type(None): lambda v: None,
+}
+_LIST_BY_TYPE = {
+    list: _clean_list,
+    str: _scalar_to_list,
+    int: _scalar_to_list,
+    float: _scalar_to_list,
+    bool: _scalar_to_list,
+    type(None): lambda v: [],
+    dict: lambda v: [],
+}
+
+
+def _as_bool(v: Any) -> bool:
+    fn = _BOOL_BY_TYPE.get(type(v))
+    return fn(v) if fn is not None else _as_bool_any(v)
+
+
+def _as_int(v: Any, default: int = 0) -> int:
+    fn = _INT_BY_TYPE.get(type(v))
+    if fn is None:
+        return _as_int_any(v, default)
+    try:
+        out = fn(v)
+    except Exception:
+        return int(default)
+    return int(default) if out is None else out
+
+
+def _as_float(v: Any, default: float = 0.0) -> float:
+    fn = _FLOAT_BY_TYPE.get(type(v))
+    if fn is None:
+        return _as_float_any(v, default)
+    try:
+        out = fn(v)
+    except Exception:
+        return float(default)
+    return float(default) if out is None else out
+
+
+def _as_list(v: Any) -> List[str]:
+    fn = _LIST_BY_TYPE.get(type(v))
+    return fn(v) if fn is not None else _as_list_any(v)
+
+
 def sanitize_final_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
     """
     Coerce payload to the stable contract expected by the evaluator.
@@ -111,11 +207,10 @@ def sanitize_final_payload(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     # extractedIntelligence is required.
     ei_in = payload.get("extractedIntelligence") if isinstance(payload.get("extractedIntelligence"), dict) else {}
-    ei: Dict[str, Any] = {}
-
-    # Ensure list-typed keys exist and are lists.
-    for k in EI_LIST_KEYS:
-        ei[k] = _as_list(ei_in.get(k))
+    # Ensure list-typed keys exist and are lists. Each payload gets its own fresh lists
+    # (never a shared template or tuple): the contract requires real lists and callers
+    # may mutate the result.
+    ei: Dict[str, Any] = {k: _as_list(ei_in.get(k)) for k in EI_LIST_KEYS}
 
     # Preserve allowed nested extras safely under extractedIntelligence.
     # Keep _signals and _meta if present and dict-like; else provide empty dicts.
@@ -152,8 +247,12 @@ def validate_contract(payload: Dict[str, Any]) -> Tuple[bool, str]:
         ei = payload.get("extractedIntelligence")
         if not isinstance(ei, dict):
             return False, "type:extractedIntelligence"
+        missing = EI_LIST_KEYS_SET - ei.keys()
+        if missing:
+            # report in EI_LIST_KEYS order so the reason is deterministic
+            return False, f"type:ei.{next(k for k in EI_LIST_KEYS if k in missing)}"
         for k in EI_LIST_KEYS:
-            if k not in ei or not isinstance(ei.get(k), list):
+            if type(ei[k]) is not list:
                 return False, f"type:ei.{k}"
         return True, "ok"
     except Exception:
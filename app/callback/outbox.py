@@ -1,25 +1,27 @@
 import time
-import json
 import random
+import uuid
 from typing import List, Dict, Any, Optional
 
 from app.settings import settings
 import app.store.session_repo as session_repo
-from app.observability.logging import log
+from app.observability.logging import log, bind
 from app.store.redis_conn import get_redis
 import app.callback.client as callback_client
 import app.observability.metrics as metrics
+from app.utils import jsonfast
 
 def _now_ms() -> int:
     return int(time.time() * 1000)
 
 def _calc_backoff(attempt: int) -> int:
     """Exponential backoff with jitter."""
-    base = int(getattr(settings, "CALLBACK_BASE_DELAY_MS", 1000) or 1000)
-    max_delay = int(getattr(settings, "CALLBACK_MAX_DELAY_MS", 3600000) or 3600000)
-    delay = base * (2 ** (attempt - 1))
-    jitter = delay * 0.1 * random.uniform(-1, 1)
-    return min(max_delay, int(delay + jitter))
+    base = int(settings.CALLBACK_BASE_DELAY_MS or 1000)
+    max_delay = int(settings.CALLBACK_MAX_DELAY_MS or 3600000)
+    delay = base << max(0, attempt - 1)
+    # ±10% jitter in integer math: 10 random bits centred on zero, scaled by 1/5120
+    jitter = (delay * (random.getrandbits(10) - 512)) // 5120
+    return min(max_delay, delay + jitter)
 
 def enqueue_outbox_entry(session_id: str) -> str:
     """
@@ -30,21 +32,108 @@ def enqueue_outbox_entry(session_id: str) -> str:
     # This function is a placeholder for strict Outbox separation if we move to a dedicated table later.
     return session_id
 
-def process_outbox_entry(session_id: str) -> bool:
+# Per-session send lease: RQ may deliver a job twice (requeue, visibility timeout), and
+# the ledger check alone is not atomic against the POST.
+_LEASE_PREFIX = "outbox:lease:"
+_RELEASE_LEASE_LUA = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+def _lease_key(session_id: str) -> str:
+    return f"{_LEASE_PREFIX}{session_id}"
+
+def _acquire_lease(session_id: str) -> Optional[str]:
     """
-    Idempotent processor for the callback outbox.
-    Returns True if delivery succeeded or terminal failure reached.
-    Returns False if retry is scheduled.
+    SET NX EX the session's lease. Returns the owner token, or None if held elsewhere.
+    Fails open when Redis errors: the ledger stays the source of truth.
+    """
+    token = uuid.uuid4().hex
+    ttl = int(settings.CALLBACK_TIMEOUT_SEC) + 5
+    try:
+        acquired = get_redis().set(_lease_key(session_id), token, nx=True, ex=ttl)
+    except Exception:
+        return token
+    if acquired:
+        return token
+    log(event="outbox_lease_busy", sessionId=session_id)
+    return None
+
+def _acquire_leases(session_ids: List[str]) -> Dict[str, Optional[str]]:
+    """
+    _acquire_lease for several sessions in one pipelined round-trip.
+    Returns session_id -> owner token (None where the lease is held elsewhere).
+    """
+    tokens = {sid: uuid.uuid4().hex for sid in session_ids}
+    ttl = int(settings.CALLBACK_TIMEOUT_SEC) + 5
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for sid, token in tokens.items():
+            pipe.set(_lease_key(sid), token, nx=True, ex=ttl)
+        acquired = pipe.execute()
+    except Exception:
+        return tokens
+    for (sid, token), ok in zip(list(tokens.items()), acquired):
+        if not ok:
+            tokens[sid] = None
+            log(event="outbox_lease_busy", sessionId=sid)
+    return tokens
+
+def _release_lease(session_id: str, token: str) -> None:
+    """Compare-and-delete, so an expired lease re-acquired by another worker is left alone."""
+    try:
+        get_redis().eval(_RELEASE_LEASE_LUA, 1, _lease_key(session_id), token)
+    except Exception:
+        pass
+
+def lease_remaining_ms(session_id: str) -> int:
+    """Milliseconds until the session's send lease lapses (0 if not held)."""
+    try:
+        return max(0, int(get_redis().pttl(_lease_key(session_id))))
+    except Exception:
+        return 0
+
+# Content-level dedup: fingerprints of report bodies already acknowledged (2xx) by the
+# partner, so identical bodies are not re-POSTed (other instances, manual re-drives).
+_SENT_PREFIX = "cb:sent:"
+_SENT_TTL_SEC = 3600
+
+def _report_fingerprint(session) -> Optional[str]:
+    fp = getattr(session, "finalReportFingerprint", None)
+    if not fp:
+        try:
+            fp = session.finalReport["extractedIntelligence"]["_meta"].get("payloadFingerprint")
+        except Exception:
+            fp = None
+    return fp if fp and fp != "na" else None
+
+def _already_sent(fingerprint: str) -> bool:
+    try:
+        return get_redis().exists(f"{_SENT_PREFIX}{fingerprint}") == 1
+    except Exception:
+        return False
+
+def _prepare_attempt(session_id: str, session=None):
+    """
+    Load the session (unless the caller already loaded it under the lease) and decide
+    whether a delivery attempt is due.
+    Returns (done, attempt) where `done` is the final result when no attempt should be
+    made (disabled, empty, already terminal, moved to DLQ, or still backing off), and
+    `attempt` is (session, ledger, attempt_idx, headers) otherwise.
     """
+    slog = bind(sessionId=session_id)
     if not settings.ENABLE_OUTBOX:
-        log(event="outbox_disabled", sessionId=session_id)
-        return True
+        slog("outbox_disabled")
+        return True, None
 
-    session = session_repo.load_session(session_id)
+    if session is None:
+        session = session_repo.load_session(session_id)
     
     if not session.finalReport:
-        log(event="outbox_empty_report", sessionId=session_id)
-        return True
+        slog("outbox_empty_report")
+        return True, None
 
     ledger = session.outboxEntry or {
         "attempts": 0,
@@ -54,57 +143,73 @@ def process_outbox_entry(session_id: str) -> bool:
     }
     
     if ledger.get("status") in ("delivered", "failed:terminal", "failed:dlq"):
-        return True
+        return True, None
 
-    if _now_ms() < int(ledger.get("nextAttemptAt", 0) or 0):
-        return False
+    now = _now_ms()
+    if now < int(ledger.get("nextAttemptAt", 0) or 0):
+        return False, None
 
-    max_attempts = int(getattr(settings, "CALLBACK_MAX_ATTEMPTS", 12) or 12)
+    max_attempts = int(settings.CALLBACK_MAX_ATTEMPTS or 12)
     if int(ledger.get("attempts", 0)) >= max_attempts:
         ledger["status"] = "failed:dlq"
         session.outboxEntry = ledger
+        # Ledger update and DLQ push in one round-trip, applied atomically (MULTI/EXEC):
+        # a crash can no longer persist 'failed:dlq' without the DLQ record, or vice versa
+        pipe = get_redis().pipeline(transaction=True)
+        session_repo.save_session(session, pipe=pipe)
+        # Compact JSON (stays JSON: the collector drains this list with json.loads)
+        pipe.lpush("callback:dlq", jsonfast.dumps({
+            "sessionId": session_id,
+            "finalReport": session.finalReport,
+            "ledger": ledger,
+            "deadAt": now
+        }))
+        pipe.execute()
+        slog("callback_dlq_moved", attempts=ledger["attempts"])
+        return True, None
+
+    fingerprint = _report_fingerprint(session)
+    if fingerprint and _already_sent(fingerprint):
+        ledger["status"] = "delivered"
+        ledger["nextAttemptAt"] = 0
+        session.outboxEntry = ledger
+        session.callbackStatus = "sent"
         session_repo.save_session(session)
-        try:
-            r = get_redis()
-            dlq_payload = json.dumps({
-                "sessionId": session_id,
-                "finalReport": session.finalReport,
-                "ledger": ledger,
-                "deadAt": _now_ms()
-            })
-            r.lpush("callback:dlq", dlq_payload)
-        except Exception:
-            pass
-        log(event="callback_dlq_moved", sessionId=session_id, attempts=ledger["attempts"])
-        return True
+        slog("callback_dedup_skipped", fingerprint=fingerprint)
+        return True, None
 
     attempt_idx = int(ledger.get("attempts", 0)) + 1
     
     headers = {
         "Idempotency-Key": str(session.reportId),
-        "X-Report-Version": str(getattr(settings, "CALLBACK_PAYLOAD_VERSION", "1.1")),
+        "X-Report-Version": str(settings.CALLBACK_PAYLOAD_VERSION),
         "Content-Type": "application/json"
     }
+    return None, (session, ledger, attempt_idx, headers)
 
-    start_ts = _now_ms()
-    
-    metrics.increment_callback_attempt()
-
-    # Use Isolated Delivery Client
-    success, status_code, error_msg = callback_client.send_final_result_http(
-        session.finalReport, 
-        headers, 
-        timeout=float(settings.CALLBACK_TIMEOUT_SEC)
-    )
 
+def _record_attempt(session, ledger: dict, attempt_idx: int, start_ts: int,
+                    success: bool, status_code: int, error_msg: Optional[str],
+                    backoff_ms: Optional[int] = None) -> bool:
+    """
+    Apply one delivery result to the ledger/metrics and persist the session.
+    `backoff_ms` overrides the exponential backoff booked for a retryable failure
+    (the deadline-bounded sync sender retries on a much shorter scale than RQ).
+    All Redis writes for the attempt (metrics, final-stream mirror, session) are
+    staged on one pipeline and sent in a single round-trip.
+    """
+    session_id = session.sessionId
+    slog = bind(sessionId=session_id)
     duration = _now_ms() - start_ts
+    pipe = get_redis().pipeline(transaction=False)
 
+    metrics.increment_callback_attempt(pipe=pipe)
     if success:
-        metrics.increment_callback_delivered()
-        metrics.record_callback_latency(duration)
+        metrics.increment_callback_delivered(pipe=pipe)
+        metrics.record_callback_latency(duration, pipe=pipe)
     else:
-        metrics.increment_callback_failed()
-        metrics.record_failed_callback(session_id)
+        metrics.increment_callback_failed(pipe=pipe)
+        metrics.record_failed_callback(session_id, pipe=pipe)
 
     record = {
         "attempt": attempt_idx,
@@ -114,7 +219,7 @@ def process_outbox_entry(session_id: str) -> bool:
         "error": error_msg,
         "success": success,
         # Track the payload/contract version used for this delivery attempt (observability / A/B)
-        "version": str(getattr(settings, "CALLBACK_PAYLOAD_VERSION", "1.1")),
+        "version": str(settings.CALLBACK_PAYLOAD_VERSION),
     }
     ledger.setdefault("history", []).append(record)
     ledger["attempts"] = attempt_idx
@@ -124,32 +229,182 @@ def process_outbox_entry(session_id: str) -> bool:
         ledger["nextAttemptAt"] = 0
         session.callbackStatus = "sent"
         # Mirror successful callback to final reporting stream
-        try:
-            r = get_redis()
-            r.lpush("callbacks:final", json.dumps(session.finalReport))
-        except Exception:
-            pass
-        log(event="callback_delivered", sessionId=session_id, attempt=attempt_idx)
+        pipe.lpush("callbacks:final", jsonfast.dumps(session.finalReport))
+        fingerprint = _report_fingerprint(session)
+        if fingerprint:
+            pipe.set(f"{_SENT_PREFIX}{fingerprint}", "1", ex=_SENT_TTL_SEC)
+        slog("callback_delivered", attempt=attempt_idx)
     else:
-        backoff = _calc_backoff(attempt_idx)
+        backoff = _calc_backoff(attempt_idx) if backoff_ms is None else int(backoff_ms)
         ledger["nextAttemptAt"] = _now_ms() + backoff
         ledger["status"] = "pending"
         
         # Terminal checks for 4xx (except 429)
         if 400 <= status_code < 500 and status_code != 429:
              ledger["status"] = "failed:terminal"
-             log(event="callback_terminal_error", sessionId=session_id, code=status_code)
+             slog("callback_terminal_error", code=status_code)
              success = True 
         else:
-             log(event="callback_retry_scheduled", sessionId=session_id, attempt=attempt_idx, backoffMs=backoff)
+             slog("callback_retry_scheduled", attempt=attempt_idx, backoffMs=backoff)
              success = False 
     
     session.outboxEntry = ledger
-    session_repo.save_session(session)
+    session_repo.save_session(session, pipe=pipe)
+    pipe.execute()
     return success
 
+
+def process_outbox_entry(session_id: str, body: Optional[bytes] = None, backoff_ms: Optional[int] = None) -> bool:
+    """
+    Idempotent processor for the callback outbox.
+    `body` optionally carries the finalReport's serialized bytes (as built at
+    finalization) so the send does not re-serialize it. `backoff_ms` optionally
+    overrides the retry backoff booked on a transient failure (see _record_attempt).
+    Returns True if delivery succeeded or terminal failure reached.
+    Returns False if retry is scheduled, or another worker holds the send lease.
+    """
+    # Lease before reading the ledger: a second worker must not act on a stale 'pending'
+    token = _acquire_lease(session_id)
+    if token is None:
+        return False
+    try:
+        return _deliver(session_id, body, backoff_ms=backoff_ms)
+    finally:
+        _release_lease(session_id, token)
+
+
+def _deliver(session_id: str, body: Optional[bytes] = None, session=None, backoff_ms: Optional[int] = None) -> bool:
+    """One attempt for a session whose lease the caller holds (see process_outbox_entry)."""
+    done, attempt = _prepare_attempt(session_id, session=session)
+    if attempt is None:
+        return done
+    session, ledger, attempt_idx, headers = attempt
+
+    start_ts = _now_ms()
+
+    # Use Isolated Delivery Client
+    success, status_code, error_msg = callback_client.send_final_result_http(
+        body if body is not None else session.finalReport,
+        headers,
+        timeout=float(settings.CALLBACK_TIMEOUT_SEC)
+    )
+
+    return _record_attempt(session, ledger, attempt_idx, start_ts, success, status_code, error_msg, backoff_ms=backoff_ms)
+
+
+def process_outbox_batch(entries: List[tuple], executor=None, backoff_ms: Optional[Dict[str, int]] = None) -> Dict[str, bool]:
+    """
+    process_outbox_entry for several sessions at once: leases and session loads are
+    each one pipelined round-trip for the whole batch (instead of two per session),
+    then the sends run on `executor` (a concurrent.futures executor) when given.
+    entries: (session_id, body_or_None) pairs; duplicate session ids are coalesced.
+    backoff_ms: optional per-session retry backoff overrides (see process_outbox_entry).
+    Returns session_id -> result, with process_outbox_entry's meaning.
+    """
+    bodies: Dict[str, Optional[bytes]] = {}
+    for session_id, body in entries:
+        if bodies.get(session_id) is None:
+            bodies[session_id] = body
+    tokens = _acquire_leases(list(bodies))
+    results = {sid: False for sid, token in tokens.items() if token is None}
+    owned = [sid for sid, token in tokens.items() if token is not None]
+    if not owned:
+        return results
+
+    try:
+        sessions = session_repo.load_sessions_bulk(owned)
+    except Exception:
+        # Fall back to per-session loads inside _prepare_attempt
+        sessions = [None] * len(owned)
+
+    def run(sid, session):
+        try:
+            return _deliver(sid, bodies[sid], session=session, backoff_ms=(backoff_ms or {}).get(sid))
+        except Exception as e:
+            log(event="outbox_batch_entry_error", sessionId=sid, error=str(e))
+            return False
+        finally:
+            _release_lease(sid, tokens[sid])
+
+    if executor is None:
+        outcomes = [run(sid, s) for sid, s in zip(owned, sessions)]
+    else:
+        outcomes = list(executor.map(run, owned, sessions))
+    results.update(zip(owned, outcomes))
+    return results
+
+
+_DRAIN_SCAN_COUNT = 200
+_DRAIN_BATCH = 100
+# Side keys under the session prefix that are not session blobs
+_DRAIN_SKIP_SUFFIXES = (":last_callback_payload",)
+
+
+def _due_ledgers(r, keys: List[str], now: int) -> List[Dict]:
+    """One pipelined GET for a batch of session keys; keep pending ledgers that are due."""
+    pipe = r.pipeline(transaction=False)
+    for k in keys:
+        pipe.get(k)
+    due = []
+    for raw in pipe.execute():
+        if not raw:
+            continue
+        try:
+            data = jsonfast.loads(raw)
+        except Exception:
+            continue
+        ledger = data.get("outboxEntry") if isinstance(data, dict) else None
+        if not isinstance(ledger, dict) or ledger.get("status") != "pending":
+            continue
+        if int(ledger.get("nextAttemptAt", 0) or 0) > now:
+            continue
+        due.append({
+            "sessionId": data.get("sessionId"),
+            "attempts": int(ledger.get("attempts", 0) or 0),
+            "nextAttemptAt": int(ledger.get("nextAttemptAt", 0) or 0),
+        })
+    return due
+
+
 def drain_outbox(limit: int = 100) -> List[Dict]:
     """
-    Placeholder for background sweeper that might scan Redis/DB for pending items.
+    Background sweeper: re-enqueue callback jobs for sessions whose outbox ledger is
+    pending and due (e.g. a lost scheduled retry). Session keys are walked with SCAN and
+    read in pipelined batches, so the cost is one round-trip per batch, not per session.
+    Returns the entries enqueued (at most `limit`).
     """
-    return []
+    # Lazy imports: jobs imports this module
+    from app.queue.jobs import send_final_callback_job, retry_job_id, retry_job_live
+    from app.queue.rq_conn import get_queue
+
+    r = get_redis()
+    now = _now_ms()
+    due: List[Dict] = []
+    batch: List[str] = []
+    for key in r.scan_iter(match=f"{session_repo.PREFIX}*", count=_DRAIN_SCAN_COUNT):
+        if key.endswith(_DRAIN_SKIP_SUFFIXES):
+            continue
+        batch.append(key)
+        if len(batch) >= _DRAIN_BATCH:
+            due.extend(_due_ledgers(r, batch, now))
+            batch = []
+            if len(due) >= limit:
+                break
+    if batch and len(due) < limit:
+        due.extend(_due_ledgers(r, batch, now))
+    due = [d for d in due if d["sessionId"]][:limit]
+
+    if due:
+        q = get_queue(name=settings.CALLBACK_RETRY_QUEUE)
+        enqueued: List[Dict] = []
+        for d in due:
+            sid = d["sessionId"]
+            job_id = retry_job_id(sid, d["attempts"])
+            # The retry for this attempt may still be scheduled/queued/running; don't double it
+            if retry_job_live(q, job_id):
+                continue
+            q.enqueue(send_final_callback_job, sid, job_id=job_id)
+            enqueued.append(d)
+        due = enqueued
+        log(event="outbox_drain_enqueued", count=len(due))
+    return due
@@ -1,22 +1,66 @@
+from operator import attrgetter
+import threading
+from typing import Tuple
 from app.store.models import SessionState
 from app.settings import settings
-from app.utils.time import now_ms, compute_engagement_seconds
-import json, hashlib
+from app.utils import jsonfast
+import hashlib
 from app.core.notes import build_agent_notes
-from app.callback.contract import sanitize_final_payload, validate_contract
+from app.callback.contract import EI_LIST_KEYS, sanitize_final_payload, validate_contract
 
-def build_final_payload(session: SessionState) -> dict:
+# Built once: fetches all EI list fields from an Intelligence in a single C-level call
+_EI_GETTER = attrgetter(*EI_LIST_KEYS)
+
+# Last built (payload, bytes) per session, keyed by everything the payload reads, so a
+# rebuild for an unchanged session skips assembly, canonical serialization and hashing.
+_PAYLOAD_CACHE = {}  # session_id -> (key_tuple, (payload, payload_bytes))
+_PAYLOAD_CACHE_MAX = 256
+_PAYLOAD_CACHE_LOCK = threading.Lock()
+
+def _assemble_payload(session: SessionState) -> dict:
     intel = session.extractedIntelligence
     
-    # Robust duration:
-    # Prefer wall-clock first/last seen times; fall back to conversation timestamps.
-    engagement_duration_seconds = compute_engagement_seconds(
-        session.conversation or [],
-        first_seen_ms=int(getattr(session, "sessionFirstSeenAtMs", 0) or 0),
-        last_seen_ms=int(getattr(session, "sessionLastSeenAtMs", 0) or 0),
-    )
+    # Duration is computed by the orchestrator when the turn is processed (before
+    # finalization), so building/rebuilding the payload never rescans the conversation.
+    engagement_duration_seconds = int(session.engagementDurationSeconds or 0)
+
+    # Intelligence categories come straight from the contract's key schema (EI_LIST_KEYS:
+    # phones, bank accounts, UPI, links, emails and the Feb-19 ID-like categories), so the
+    # key set is declared once; every key is a list-typed Intelligence field.
+    ei = dict(zip(EI_LIST_KEYS, _EI_GETTER(intel)))
+
+    if settings.INCLUDE_DYNAMIC_ARTIFACTS_CALLBACK:
+        ei["dynamicArtifacts"] = intel.dynamicArtifacts or {}
+
+    # Keyword signals live under a nested container to keep non-core keys scoped
+    # strictly inside extractedIntelligence (and avoid polluting the top-level EI keys).
+    # Opt-in: when off, the contract still emits an empty _signals object.
+    if settings.INCLUDE_SIGNALS_IN_CALLBACK:
+        ei["_signals"] = {"suspiciousKeywords": list(intel.suspiciousKeywords or [])}
 
-    extracted = {
+    # ---- Extra keys allowed ONLY inside extractedIntelligence (per constraint) ----
+    # Keep payload contract metadata here (not top-level).
+    version = settings.CALLBACK_PAYLOAD_VERSION
+    ei["_meta"] = {
+        "payloadVersion": version,
+        "contractVersion": version, # Objective 3
+    }
+
+    # agentNotes: prefer explicitly stored notes; else build from persisted detector fields
+    notes = (session.agentNotes or "").strip()
+    if not notes:
+        try:
+            notes = build_agent_notes({
+                "scamType": (session.scamType or ""),
+                "reasons": list(session.detectorReasons or []),
+            })
+        except Exception:
+            notes = ""
+    notes = notes or "Scam-like patterns detected."
+
+    # One dict display with constant keys: built presized in a single step (the keys are
+    # compile-time constants, already interned) rather than grown by later inserts.
+    return {
         "sessionId": session.sessionId,
         "scamDetected": bool(session.scamDetected),
         "totalMessagesExchanged": int(session.totalMessagesExchanged),
@@ -24,97 +68,131 @@ def build_final_payload(session: SessionState) -> dict:
         "engagementDurationSeconds": engagement_duration_seconds,
         # Optional structure bonuses
         "scamType": (session.scamType or ""),
-        "confidenceLevel": float(getattr(session, "confidence", 0.0) or 0.0),
+        "confidenceLevel": float(session.confidence or 0.0),
+        "extractedIntelligence": ei,
+        "agentNotes": notes,
     }
-    ei = {
-        "bankAccounts": intel.bankAccounts,
-        "upiIds": intel.upiIds,
-        "phishingLinks": intel.phishingLinks,
-        "phoneNumbers": intel.phoneNumbers,
-        # ✅ NEW: include emails in final payload (supported by evaluator schema)
-        "emailAddresses": intel.emailAddresses,
-        # ✅ NEW: ID-like categories now included by Feb-19 rubric
-        "caseIds": intel.caseIds,
-        "policyNumbers": intel.policyNumbers,
-        "orderNumbers": intel.orderNumbers,
-    }
-    
-    # Ensure ID-like categories are present (empty lists if none) to avoid evaluator misses
-    # (Though extractedIntelligence dataclass defaults are lists, ensure presence in dict output)
-    if "caseIds" not in ei: ei["caseIds"] = []
-    if "policyNumbers" not in ei: ei["policyNumbers"] = []
-    if "orderNumbers" not in ei: ei["orderNumbers"] = []
 
-    if getattr(settings, "INCLUDE_DYNAMIC_ARTIFACTS_CALLBACK", False):
-        ei["dynamicArtifacts"] = getattr(intel, "dynamicArtifacts", {}) or {}
 
-    # Move keyword signals under a nested container to keep non-core keys scoped
-    # strictly inside extractedIntelligence (and avoid polluting the top-level EI keys).
-    try:
-        sig = ei.get("_signals")
-        if not isinstance(sig, dict):
-            sig = {}
-        sig["suspiciousKeywords"] = list(getattr(intel, "suspiciousKeywords", []) or [])
-        ei["_signals"] = sig
-    except Exception:
-        pass
+# Pristine BLAKE2b-256 state, parameterized once; each fingerprint clones it (.copy()
+# returns an independent object, so this is thread-safe) instead of re-initializing.
+# No prefix is mixed in: the payload/contract versions are already inside the hashed
+# canonical bytes (_meta), and fingerprints stay plain blake2b-256 of those bytes.
+_BLAKE2B_256 = hashlib.blake2b(digest_size=32)
 
-    # ---- Extra keys allowed ONLY inside extractedIntelligence (per constraint) ----
-    # Keep payload contract metadata here (not top-level).
-    try:
-        meta = {
-            "payloadVersion": getattr(settings, "CALLBACK_PAYLOAD_VERSION", "1.1"),
-            "contractVersion": getattr(settings, "CALLBACK_PAYLOAD_VERSION", "1.1"), # Objective 3
-        }
-        ei["_meta"] = meta
-    except Exception:
-        pass
 
-    extracted["extractedIntelligence"] = ei
-    # agentNotes: prefer explicitly stored notes; else build from persisted detector fields
-    try:
-        notes = (session.agentNotes or "").strip()
-        if not notes:
-            det = {
-                "scamType": (session.scamType or ""),
-                "reasons": list(getattr(session, "detectorReasons", []) or []),
-            }
-            notes = build_agent_notes(det)
-        extracted["agentNotes"] = notes or "Scam-like patterns detected."
-    except Exception:
-        extracted["agentNotes"] = session.agentNotes or "Scam-like patterns detected."
+# With sorted keys, "_meta" is always the first key of extractedIntelligence (the other
+# EI keys all sort after "_"), so this marker locates it in the canonical bytes.
+_META_MARKER = b'"extractedIntelligence":{"_meta":{'
+
+
+def _stamp_fingerprint(canonical: bytes, fingerprint: str) -> bytes:
+    """Splice payloadFingerprint into the canonical bytes' _meta object (no re-encode)."""
+    i = canonical.find(_META_MARKER)
+    if i < 0:
+        return b""
+    j = i + len(_META_MARKER)
+    sep = b"" if canonical[j:j + 1] == b"}" else b","
+    return b"".join((canonical[:j], b'"payloadFingerprint":', jsonfast.dumps(fingerprint), sep, canonical[j:]))
+
 
+def sanitize_and_serialize(payload: dict) -> Tuple[dict, bytes]:
+    """
+    Single pass from raw payload to wire form: sanitize/lock the contract, stamp the
+    fingerprint, and serialize once. Returns (payload, payload_bytes); the bytes are
+    what Redis stores and what the callback POSTs, so nothing re-serializes them.
+    """
+    # sanitize_final_payload always yields a contract-valid shape (validate_contract
+    # would only re-check what it just built), so no separate validation walk.
+    sanitized = sanitize_final_payload(payload)
+    meta = dict(sanitized["extractedIntelligence"]["_meta"])
+    meta.pop("payloadFingerprint", None)
+    sanitized["extractedIntelligence"]["_meta"] = meta
+
+    # Canonical form (sorted keys, compact) of the sanitized payload, before stamping.
+    # It is hashed for the fingerprint and then reused as the wire body.
+    canonical = jsonfast.dumps(sanitized, sort_keys=True)
     try:
-        algo = getattr(settings, "PAYLOAD_FINGERPRINT_ALGO", "sha256").lower()
-        # Canonicalization: Sort keys, separators=(",", ":") for compact JSON
-        canonical = json.dumps(extracted, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
-        h = hashlib.new(algo)
-        h.update(canonical.encode("utf-8"))
-        # Store fingerprint under extractedIntelligence._meta (allowed zone)
-        try:
-            extracted["extractedIntelligence"].setdefault("_meta", {})
-            extracted["extractedIntelligence"]["_meta"]["payloadFingerprint"] = f"{algo}:{h.hexdigest()}"
-        except Exception:
-            pass
+        algo = (settings.PAYLOAD_FINGERPRINT_ALGO or "blake2b").lower()
+        if algo == "blake2b":
+            # Faster than SHA-256 in software for short buffers; 32-byte digest keeps
+            # the fingerprint the same length as the sha256 one
+            h = _BLAKE2B_256.copy()
+            h.update(canonical)
+            fingerprint = "blake2b:" + h.hexdigest()
+        elif algo == "sha256":
+            # Direct constructor skips hashlib.new's name dispatch (OpenSSL SHA-NI path)
+            fingerprint = "sha256:" + hashlib.sha256(canonical).hexdigest()
+        else:
+            fingerprint = f"{algo}:{hashlib.new(algo, canonical).hexdigest()}"
     except Exception:
         # keep payload even if hashing fails
-        try:
-            extracted["extractedIntelligence"].setdefault("_meta", {})
-            extracted["extractedIntelligence"]["_meta"]["payloadFingerprint"] = "na"
-        except Exception:
-            pass
+        fingerprint = "na"
+    # Store fingerprint under extractedIntelligence._meta (allowed zone)
+    meta["payloadFingerprint"] = fingerprint
+
+    body = _stamp_fingerprint(canonical, fingerprint)
+    return sanitized, body or jsonfast.dumps(sanitized)
+
+
+def _payload_cache_key(session: SessionState) -> tuple:
+    """Cheap tuple of every input _assemble_payload/sanitize_and_serialize depend on."""
+    intel = session.extractedIntelligence
+    dynamic = ()
+    if settings.INCLUDE_DYNAMIC_ARTIFACTS_CALLBACK:
+        dynamic = tuple(sorted((k, tuple(v or ())) for k, v in (intel.dynamicArtifacts or {}).items()))
+    return (
+        session.totalMessagesExchanged,
+        len(session.conversation or ()),
+        tuple(map(tuple, _EI_GETTER(intel))),
+        settings.INCLUDE_SIGNALS_IN_CALLBACK and tuple(intel.suspiciousKeywords or ()),
+        dynamic,
+        session.scamDetected,
+        session.scamType,
+        session.confidence,
+        session.agentNotes,
+        tuple(session.detectorReasons or ()),
+        session.engagementDurationSeconds,
+        settings.INCLUDE_DYNAMIC_ARTIFACTS_CALLBACK,
+        settings.CALLBACK_PAYLOAD_VERSION,
+        settings.PAYLOAD_FINGERPRINT_ALGO,
+    )
+
+
+def _copy_payload(obj):
+    """Copy dict/list containers so callers never share nested state with the cache entry."""
+    if isinstance(obj, dict):
+        return {k: _copy_payload(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_copy_payload(v) for v in obj]
+    return obj
+
+
+def build_final_payload_bytes(session: SessionState, use_cache: bool = True) -> Tuple[dict, bytes]:
+    """Like build_final_payload, but also returns the wire JSON bytes for reuse."""
+    if not use_cache:
+        return sanitize_and_serialize(_assemble_payload(session))
+
+    key = _payload_cache_key(session)
+    hit = _PAYLOAD_CACHE.get(session.sessionId)
+    if hit and hit[0] == key:
+        payload, body = hit[1]
+        # Callers stamp fields (incl. nested EI/_meta) on their own copy
+        return _copy_payload(payload), body
+
+    payload, body = sanitize_and_serialize(_assemble_payload(session))
+    with _PAYLOAD_CACHE_LOCK:
+        _PAYLOAD_CACHE[session.sessionId] = (key, (payload, body))
+        while len(_PAYLOAD_CACHE) > _PAYLOAD_CACHE_MAX:
+            # dicts keep insertion order: drop the oldest entry
+            _PAYLOAD_CACHE.pop(next(iter(_PAYLOAD_CACHE)), None)
+    return _copy_payload(payload), body
 
-    # Final step: sanitize/lock contract for evaluator scoring.
-    sanitized = sanitize_final_payload(extracted)
 
-    # Best-effort: ensure we didn't accidentally break the contract.
-    ok, _reason = validate_contract(sanitized)
-    if not ok:
-        # Even if validation fails (should be rare), return the sanitized payload anyway.
-        # The sender will re-sanitize again before POST.
-        return sanitized
+def build_final_payload(session: SessionState, use_cache: bool = True) -> dict:
+    """Build the sanitized, fingerprinted final report for the evaluator callback."""
+    return build_final_payload_bytes(session, use_cache=use_cache)[0]
 
-    return sanitized
 
 def validate_final_payload(payload: dict) -> (bool, str):
     """
@@ -11,45 +11,79 @@ This module is idempotent-friendly: callers should check session.callbackStatus
 from __future__ import annotations
 
 import time
+from typing import Optional
 from app.settings import settings
-from app.store.session_repo import load_session, save_session
+from app.store.session_repo import load_session, save_session, load_session_fields
 from app.callback.outbox import process_outbox_entry
-from app.observability.logging import log
+from app.observability.logging import log_json
+from app.utils.time import now_ms
 
+# Backoff booked in the ledger for a failed attempt that still has an inline retry left,
+# by attempt (the RQ-scale CALLBACK_BASE_DELAY_MS backoff would outlast the deadline).
+# The last inline attempt books the normal backoff for the RQ fallback.
+_SYNC_BACKOFF_MS = (50, 150, 400)
+# Never wait longer than that inline (e.g. a backoff booked by another path)
+_MAX_INLINE_RETRY_WAIT_SEC = _SYNC_BACKOFF_MS[-1] / 1000.0
 
-def send_final_result_sync(session_id: str, *, deadline_sec: float = 8.0, max_retries: int = 1) -> bool:
+
+def send_final_result_sync(session_id: str, *, deadline_sec: float = 8.0, max_retries: int = 1, body: Optional[bytes] = None) -> bool:
     """
     Try to POST the final output synchronously within deadline_sec using the unified Outbox processor.
+    `body` is the already-serialized finalReport, when the caller has it.
     Returns True on success, False on failure.
     """
     if not settings.GUVI_CALLBACK_URL:
-        try:
-            log(event="final_output_sync_skipped_no_url", sessionId=session_id)
-        except Exception:
-            pass
+        log_json("final_output_sync_skipped_no_url", sessionId=session_id)
         return False
 
     t0 = time.monotonic()
+    deadline = t0 + deadline_sec
+    # Settings are read once per call, not per attempt (they stay runtime-mutable, so
+    # they are not bound at import)
+    send_timeout = float(settings.CALLBACK_TIMEOUT_SEC)
+    batched = int(settings.CALLBACK_BATCH_WINDOW_MS or 0) > 0
     
     # Attempt 1 (or more if fast failure and budget allows)
     # process_outbox_entry handles validation, payload building (if missing), and ledger updates.
-    
-    # Force outbox processing
-    try:
-        success = process_outbox_entry(session_id)
-        if success:
-            try:
-                log(event="final_output_sync_success", sessionId=session_id, elapsedMs=int((time.monotonic() - t0) * 1000))
-            except Exception:
-                pass
-            return True
-    except Exception as e:
+    # Non-retryable 4xx are terminal in the ledger (process_outbox_entry returns True), so
+    # only transient failures come back here for another attempt.
+    attempts = 1 + max(0, int(max_retries))
+    for attempt in range(attempts):
+        backoff_ms = _SYNC_BACKOFF_MS[min(attempt, len(_SYNC_BACKOFF_MS) - 1)] if attempt + 1 < attempts else None
+        if attempt:
+            # Sleep only until the ledger's own backoff (nextAttemptAt) elapses, only when
+            # that backoff is short, and only when it plus a full send still fits in the
+            # deadline; otherwise leave the retry to RQ instead of holding the request.
+            wait = _retry_wait_sec(session_id)
+            if wait is None or wait > _MAX_INLINE_RETRY_WAIT_SEC or time.monotonic() + wait + send_timeout > deadline:
+                break
+            time.sleep(wait)
+
         try:
-            log(event="final_output_sync_exception", sessionId=session_id, error=str(e))
-        except Exception:
-            pass
+            if batched:
+                # Combined with concurrent finalizations; the wait is bounded by the deadline
+                from app.callback.batch_sender import get_batch_sender
+                success = get_batch_sender().submit(session_id, body=body, timeout=max(0.0, deadline - time.monotonic()), backoff_ms=backoff_ms)
+            else:
+                success = process_outbox_entry(session_id, body=body, backoff_ms=backoff_ms)
+            if success:
+                log_json("final_output_sync_success", sessionId=session_id, elapsedMs=int((time.monotonic() - t0) * 1000), attempts=attempt + 1)
+                return True
+        except Exception as e:
+            log_json("final_output_sync_exception", sessionId=session_id, error=str(e))
 
     # If failed, the ledger is updated with 'pending' and 'nextAttemptAt'.
     # The hybrid mode (caller) will likely enqueue the job, which will pick it up after backoff.
     
     return False
+
+
+def _retry_wait_sec(session_id: str) -> Optional[float]:
+    """Seconds until the ledger allows the next attempt; None if nothing is pending."""
+    try:
+        ledger = load_session_fields(session_id, ("outboxEntry",))["outboxEntry"] or {}
+    except Exception:
+        return None
+    if ledger.get("status") != "pending":
+        return None
+    return max(0, int(ledger.get("nextAttemptAt", 0) or 0) - now_ms()) / 1000.0
@@ -69,30 +69,30 @@ INT_CLOSE_AND_VERIFY_SELF = "INT_CLOSE_AND_VERIFY_SELF"
 # Intent Groupings
 
 # Intents capable of extracting primary registry artifacts
-HIGH_YIELD_ARTIFACT_INTENTS = {
+HIGH_YIELD_ARTIFACT_INTENTS = frozenset({
     INT_CHANNEL_FAIL,
     INT_ASK_OFFICIAL_WEBSITE,
     INT_ASK_OFFICIAL_HELPLINE,
     INT_ASK_ALT_VERIFICATION,
     INT_SECONDARY_FAIL
-}
+})
 
 # Intents enforcing security boundaries without data yield
-SINGLE_USE_BOUNDARY_INTENTS = {
+SINGLE_USE_BOUNDARY_INTENTS = frozenset({
     INT_REFUSE_SENSITIVE_ONCE,
     INT_CLOSE_AND_VERIFY_SELF
-}
+})
 
 # Intents representing non-functional transactional states
-SECONDARY_FAILURE_INTENTS = {
+SECONDARY_FAILURE_INTENTS = frozenset({
     INT_SECONDARY_FAIL,
     INT_CHANNEL_FAIL
-}
+})
 
 # Intents marking session termination
-CLOSING_INTENTS = {
+CLOSING_INTENTS = frozenset({
     INT_CLOSE_AND_VERIFY_SELF
-}
+})
 
 # How many previous turns to consider before we allow repeating ALT_VERIFICATION
 # Increasing to 2 helps avoid visible loops in short evaluator runs.
@@ -15,7 +15,15 @@ from app.intel.artifact_registry import artifact_registry
 from app.settings import settings as default_settings
 from app.core.investigative_ladder import choose_ladder_target
 import hashlib
-import json
+import re
+
+try:
+    import xxhash  # optional: non-cryptographic, much faster than md5 for change detection
+    # 64 bits is ample for a per-session "did intel change" check and keeps the
+    # persisted signature short
+    _signature_hasher = xxhash.xxh3_64
+except ImportError:  # pragma: no cover - depends on the optional dependency
+    _signature_hasher = hashlib.md5
 
 
 # ---------------------------------------------------------------------------
@@ -23,6 +31,10 @@ import json
 # We avoid importing detector internals; simple keyword check on latest_text.
 # ---------------------------------------------------------------------------
 _BOUNDARY_TERMS = ("otp", "pin", "password")
+# One compiled alternation: a single C-level scan per message instead of one `in` per term.
+# Substring semantics are kept (no word boundaries, so "OTP123" still counts); IGNORECASE
+# avoids a lower-cased copy of every message.
+_BOUNDARY_SEARCH = re.compile("|".join(map(re.escape, _BOUNDARY_TERMS)), re.IGNORECASE).search
 
 
 # ============================================================
@@ -44,21 +56,16 @@ DEFAULT_ARTIFACT_INTENT_MAP = {
 # This is NOT a hard requirement; we still terminate on
 # no-progress/repeat/max-turns to ensure completion.
 EXPECTED_IOCS_BY_SCAMTYPE = {
-    "BANK_IMPERSONATION": ["phoneNumbers", "bankAccounts", "caseIds"],
-    "UPI_FRAUD":          ["upiIds", "phoneNumbers", "caseIds"],
-    "PHISHING":           ["phishingLinks", "emailAddresses", "orderNumbers"],
-    "JOB_SCAM":           ["phoneNumbers", "upiIds", "policyNumbers"],
+    "BANK_IMPERSONATION": ("phoneNumbers", "bankAccounts", "caseIds"),
+    "UPI_FRAUD":          ("upiIds", "phoneNumbers", "caseIds"),
+    "PHISHING":           ("phishingLinks", "emailAddresses", "orderNumbers"),
+    "JOB_SCAM":           ("phoneNumbers", "upiIds", "policyNumbers"),
 }
 
 def _expected_iocs_covered(intel_dict: Dict[str, Any], scam_type: str) -> bool:
-    exp = EXPECTED_IOCS_BY_SCAMTYPE.get((scam_type or "UNKNOWN").upper(), [])
-    if not exp:
-        return False
-    for k in exp:
-        vals = intel_dict.get(k) or []
-        if not (isinstance(vals, list) and len(vals) > 0):
-            return False
-    return True
+    # intel_dict comes from the Intelligence dataclass (list fields): truthiness == non-empty
+    exp = EXPECTED_IOCS_BY_SCAMTYPE.get((scam_type or "UNKNOWN").upper())
+    return bool(exp) and all(intel_dict.get(k) for k in exp)
 
 # Controller-owned reasons so we never fall back to generic strings when we know better
 CTRL_REASON_EXPECTED_IOCS = "expected_iocs_covered"
@@ -75,7 +82,7 @@ def keep_going() -> Dict[str, str]:
 
 # Repetition control / progression helpers
 # Allowed intents that directly support artifact progress or safe control surfaces
-_ALLOWED_INTENTS = {
+_ALLOWED_INTENTS = frozenset({
     INT_REFUSE_SENSITIVE_ONCE,        # one-time boundary
     INT_ASK_OFFICIAL_HELPLINE,        # phoneNumbers
     INT_ASK_OFFICIAL_WEBSITE,         # phishingLinks
@@ -86,10 +93,13 @@ _ALLOWED_INTENTS = {
     INT_ACK_CONCERN,                  # minimal filler (guarded by anti-loop)
     INT_ASK_TICKET_REF,               # progression
     INT_ASK_DEPARTMENT_BRANCH,        # progression
-}
+})
 
-_ACK_SET = {INT_ACK_CONCERN}
+_ACK_SET = frozenset({INT_ACK_CONCERN})
 _RECENT_WINDOW = 3
+# bf_recent_intents stays a plain list: it is persisted through the session JSON and sliced
+# by the pickers; at this size trimming the head is a few pointer moves.
+_RECENT_HISTORY_MAX = 10
 
 # Broad instruction phrases per intent (fallbacks)
 INSTRUCTION_TEXTS: Dict[str, str] = {
@@ -110,95 +120,163 @@ def _intent_for_key(ioc_key: str) -> str:
     Resolve intent for a registry IOC key, using dynamic registry.intent_map if present,
     else fallback to DEFAULT_ARTIFACT_INTENT_MAP.
     """
-    dyn = artifact_registry.intent_map.get(ioc_key) if hasattr(artifact_registry, "intent_map") else None
-    if isinstance(dyn, dict) and dyn.get("intent"):
-        return str(dyn["intent"])
+    # intent_map is always set (ArtifactRegistry.__init__) but is replaced wholesale on
+    # refresh, so it is read live rather than bound at import.
+    dyn = artifact_registry.intent_map.get(ioc_key)
+    if isinstance(dyn, dict):
+        intent = dyn.get("intent")
+        if intent:
+            return str(intent)
     return DEFAULT_ARTIFACT_INTENT_MAP.get(ioc_key, INT_ACK_CONCERN)
 
 def _instruction_for(intent: str, ioc_key: str = None) -> str:
-    dyn = artifact_registry.intent_map.get(ioc_key or "", {}) if hasattr(artifact_registry, "intent_map") else {}
-    return str(dyn.get("instruction") or INSTRUCTION_TEXTS.get(intent, "acknowledge briefly"))
+    # Most ticks carry no IOC key: go straight to the static text (one dict lookup)
+    if ioc_key:
+        dyn = artifact_registry.intent_map.get(ioc_key)
+        instruction = dyn.get("instruction") if dyn else None
+        if instruction:
+            return str(instruction)
+    return INSTRUCTION_TEXTS.get(intent, "acknowledge briefly")
 
 def _ioc_category_count_from_dict(intel_dict: Dict[str, Any]) -> int:
-    count = 0
-    for k in artifact_registry.artifacts.keys():
-        if intel_dict.get(k):
-            if isinstance(intel_dict.get(k), list) and len(intel_dict.get(k)) > 0:
-                count += 1
-    return count
+    # One pass over intel_dict with O(1) registry membership. The registry dict is read
+    # live rather than frozen at import (dynamic artifacts can register at runtime).
+    artifacts = artifact_registry.artifacts
+    return sum(1 for k, v in intel_dict.items() if v and k in artifacts)
+
+# Signature of "no intel in any registry category". Non-empty on purpose: the controller
+# treats an empty previous signature as "first turn".
+_EMPTY_IOC_SIGNATURE = _signature_hasher(b"").hexdigest()
+# Registry keys in signature order, re-sorted only when artifact_registry.version moves
+_SIGNATURE_KEYS: tuple = ()
+_SIGNATURE_KEYS_VERSION = -1
+
+
+def _signature_keys() -> tuple:
+    global _SIGNATURE_KEYS, _SIGNATURE_KEYS_VERSION
+    if _SIGNATURE_KEYS_VERSION != artifact_registry.version:
+        _SIGNATURE_KEYS = tuple(sorted(artifact_registry.artifacts))
+        _SIGNATURE_KEYS_VERSION = artifact_registry.version
+    return _SIGNATURE_KEYS
+
 
 def compute_ioc_signature(intel_dict: Dict[str, Any]) -> str:
-    data = {}
-    for key in artifact_registry.artifacts.keys():
-        if key in intel_dict:
-            data[key] = sorted(intel_dict[key])
-    encoded = json.dumps(data, sort_keys=True).encode()
-    return hashlib.md5(encoded).hexdigest()
+    # Canonical "key\0v1\1v2\2..." over the registry keys with values, hashed in one
+    # update. The digest must be stable across processes (it is persisted on the session
+    # and compared by whichever worker takes the next turn), so no builtin hash() here.
+    parts = []
+    for key in _signature_keys():
+        vals = intel_dict.get(key)
+        if not vals:
+            continue
+        if len(vals) > 1:
+            vals = sorted(vals)
+        parts.append(key + "\x00" + "\x01".join(map(str, vals)) + "\x02")
+    if not parts:
+        # Early-session common case: no intel yet, nothing to hash
+        return _EMPTY_IOC_SIGNATURE
+    return _signature_hasher("".join(parts).encode()).hexdigest()
 
 
 # ------------------------------------------------------------
 # Scam-Aware Priority Boost
 # ------------------------------------------------------------
 
+# (scam_type, artifact key) -> priority boost; pairs not listed get 0
+_SCAM_PRIORITY_BOOST = {
+    ("UPI_FRAUD", "upiIds"): 10,
+    ("UPI_FRAUD", "bankAccounts"): 10,
+    ("PHISHING", "phishingLinks"): 10,
+    ("BANK_IMPERSONATION", "phoneNumbers"): 8,
+    ("JOB_SCAM", "phoneNumbers"): 6,
+    ("JOB_SCAM", "bankAccounts"): 6,
+}
+
 def _scam_priority_boost(spec, scam_type: str) -> int:
-    if scam_type == "UPI_FRAUD" and spec.key in ("upiIds", "bankAccounts"):
-        return 10
-    if scam_type == "PHISHING" and spec.key == "phishingLinks":
-        return 10
-    if scam_type == "BANK_IMPERSONATION" and spec.key == "phoneNumbers":
-        return 8
-    if scam_type == "JOB_SCAM" and spec.key in ("phoneNumbers", "bankAccounts"):
-        return 6
-    return 0
+    return _SCAM_PRIORITY_BOOST.get((scam_type, spec.key), 0)
+
+
+# Scam types that _SCAM_PRIORITY_BOOST ranks differently; any other type sorts like UNKNOWN.
+_BOOSTED_SCAM_TYPES = ("UPI_FRAUD", "PHISHING", "BANK_IMPERSONATION", "JOB_SCAM", "UNKNOWN")
+# Registry specs pre-sorted per scam type, rebuilt only when artifact_registry.version moves
+# (registration, dynamic specs, override refresh) instead of sorting on every tick.
+# Tuples: the orderings are shared by every caller and must not be mutated in place.
+_SORTED_SPECS: Dict[str, tuple] = {}
+_SORTED_SPECS_VERSION = -1
+
+
+def _build_sorted_specs() -> None:
+    global _SORTED_SPECS, _SORTED_SPECS_VERSION
+    version = artifact_registry.version
+    specs = list(artifact_registry.artifacts.values())
+    _SORTED_SPECS = {
+        scam: tuple(sorted(
+            specs,
+            key=lambda x, scam=scam: (
+                x.priority + _scam_priority_boost(x, scam),
+                not x.passive_only,
+            ),
+            reverse=True,
+        ))
+        for scam in _BOOSTED_SCAM_TYPES
+    }
+    _SORTED_SPECS_VERSION = version
+
+
+def _sorted_specs(scam_type: str) -> tuple:
+    if _SORTED_SPECS_VERSION != artifact_registry.version:
+        _build_sorted_specs()
+    specs = _SORTED_SPECS
+    return specs.get(scam_type) or specs["UNKNOWN"]
 
 
 def _pick_missing_intel_target(
     intel_dict: Dict[str, Any],
     recent_intents: List[str],
     scam_type: str = "UNKNOWN",
+    avoid_intent: str = None,
 ) -> (str, str):
+    """
+    avoid_intent is treated as if appended to recent_intents (see _pivot_intent), without
+    copying the whole history list.
+    """
+    specs = _sorted_specs(scam_type)
 
-    specs = sorted(
-        artifact_registry.artifacts.values(),
-        key=lambda x: (
-            x.priority + _scam_priority_boost(x, scam_type),
-            not x.passive_only,
-        ),
-        reverse=True,
-    )
-
-    recent_window = set(recent_intents[-3:])
+    # Last 3 intents (a tiny list: membership is as cheap as a set, minus the set build)
+    if avoid_intent is None:
+        recent_window = recent_intents[-3:]
+        history_len = len(recent_intents)
+    else:
+        recent_window = recent_intents[-2:] + [avoid_intent]
+        history_len = len(recent_intents) + 1
 
-    # Strict cooldown pass
+    # Single pass: return the first missing artifact whose intent is off cooldown; remember
+    # the first one that is on cooldown as the relaxed fallback (what a second, relaxed
+    # pass over the same order would pick).
+    fallback = None
     for spec in specs:
         if not spec.enabled or not spec.ask_enabled or spec.passive_only:
             continue
 
-        intent = _intent_for_key(spec.key)
-        if not intent:
+        # Cheap presence check first: resolving the intent consults the dynamic intent map
+        if intel_dict.get(spec.key):
             continue
 
-        if intel_dict.get(spec.key):
+        intent = _intent_for_key(spec.key)
+        if not intent:
             continue
 
         if intent in recent_window:
+            if fallback is None:
+                fallback = (intent, spec.key)
             continue
 
         return intent, spec.key
 
-    # Relax cooldown pass
-    for spec in specs:
-        if not spec.enabled or not spec.ask_enabled or spec.passive_only:
-            continue
-
-        intent = _intent_for_key(spec.key)
-        if not intent:
-            continue
-
-        if not intel_dict.get(spec.key):
-            return intent, spec.key
+    if fallback is not None:
+        return fallback
 
-    if len(recent_intents) >= 3 and all(x in _ACK_SET for x in recent_intents[-3:]):
+    if history_len >= 3 and all(x in _ACK_SET for x in recent_window):
         return INT_ASK_ALT_VERIFICATION, None
     return INT_ACK_CONCERN, None
 
@@ -220,8 +298,9 @@ def _pivot_intent(
 ) -> (str, str):
     return _pick_missing_intel_target(
         intel_dict,
-        recent_intents + [avoid_intent],
+        recent_intents,
         scam_type,
+        avoid_intent=avoid_intent,
     )
 
 
@@ -229,9 +308,10 @@ def _pivot_intent(
 # Group B helpers
 # ----------------------------
 def _count_intent_in_window(recent: List[str], name: str, window: int) -> int:
+    # list.count runs in C; the history is capped at _RECENT_HISTORY_MAX entries
     if window <= 0:
         return recent.count(name)
-    return sum(1 for x in recent[-window:] if x == name)
+    return recent[-window:].count(name)
 
 def _otp_pressure_count(session, window_msgs: int) -> int:
     try:
@@ -242,26 +322,127 @@ def _otp_pressure_count(session, window_msgs: int) -> int:
             if window_msgs <= 0:
                 break
             if (m.get("sender") or "").lower() == "scammer":
-                txt = (m.get("text") or "").lower()
-                if any(t in txt for t in _BOUNDARY_TERMS):
+                if _BOUNDARY_SEARCH(m.get("text") or ""):
                     c += 1
                 window_msgs -= 1
         return c
     except Exception:
         return 0
 
-def _alt_satisfied(intel_dict: Dict[str, Any]) -> bool:
+
+# ----------------------------
+# Anti-redundancy helpers (category cooldown + satisfied guard)
+# ----------------------------
+def _constrain(intent: str, intel_dict: Dict[str, Any], recent_intents: List[str], scam_type: str) -> str:
+    # If a non-allowed intent is produced, pivot to a productive one
+    if intent not in _ALLOWED_INTENTS:
+        # choose a missing-intel intent based on registry
+        return _pick_missing_intel_intent(intel_dict, recent_intents, scam_type)
+    return intent
+
+# These run after choose_next_action's session-defaults block has coerced
+# askedArtifactLastTurn to a dict, so they access it directly.
+def _has_vals(intel_dict: Dict[str, Any], key: str) -> bool:
+    vals = intel_dict.get(key)
+    return isinstance(vals, list) and len(vals) > 0
+
+def _asked_map(session) -> Dict[str, int]:
+    return session.askedArtifactLastTurn
+
+def _avoid_keys(session) -> List[str]:
+    return getattr(session, "lastNewIocKeys", None) or []
+
+def _cooldown_block(session, key: str, turn_index: int, window_turns: int = 4) -> bool:
     """
-    ALT_VERIFICATION typically seeks alternate official verification paths,
-    which often yield phoneNumbers or phishingLinks. If either is already present,
-    prefer not to ask ALT again.
+    Prevent repeatedly asking the same category too soon.
+    window_turns counts in session.turnIndex units (which includes both sides).
     """
-    try:
-        has_phone = bool(intel_dict.get("phoneNumbers"))
-        has_link = bool(intel_dict.get("phishingLinks"))
-        return has_phone or has_link
-    except Exception:
-        return False
+    return (turn_index - session.askedArtifactLastTurn.get(key, -10**9)) < window_turns
+
+def _mark_asked(session, key: str, turn_index: int) -> None:
+    m = dict(session.askedArtifactLastTurn)
+    m[key] = turn_index
+    session.askedArtifactLastTurn = m
+
+
+# Broken-flow states in progression order (states stay strings: they are persisted on the
+# session and compared by the orchestrator and tests)
+_BF_RANK = {BF_S0: 0, BF_S1: 1, BF_S2: 2, BF_S3: 3, BF_S4: 4, BF_S5: 5}
+
+def _advance_to(state: str, target: str) -> str:
+    """Move state forward to target; never backwards (unknown states are left alone)."""
+    rank = _BF_RANK.get(state)
+    if rank is not None and rank < _BF_RANK[target]:
+        return target
+    return state
+
+
+def _break_loop(state: str, no_progress: int, bounces: int, no_progress_limit: int, bounce_limit: int) -> (str, int):
+    """
+    Loop-breaking transition: S1 always moves on; S2..S4 step forward once stalled for
+    no_progress_limit turns (S3 bounces to S4 up to bounce_limit times, then closes).
+    Pure: returns (state, bounces).
+    """
+    if state == BF_S1:
+        return BF_S2, bounces
+    if no_progress < no_progress_limit:
+        return state, bounces
+    if state == BF_S2:
+        return BF_S3, bounces
+    if state == BF_S3:
+        if bounces < bounce_limit:
+            return BF_S4, bounces + 1
+        return BF_S5, bounces
+    if state == BF_S4:
+        return BF_S5, bounces
+    return state, bounces
+
+
+# Satisfied-category guards: (intent, IOC key that already answers it, pivot reason)
+_SATISFIED_GUARDS = (
+    (INT_ASK_OFFICIAL_HELPLINE, "phoneNumbers", "satisfied_guard_pivot_phone"),
+    (INT_ASK_OFFICIAL_WEBSITE, "phishingLinks", "satisfied_guard_pivot_link"),
+    (INT_ASK_TICKET_REF, "caseIds", "satisfied_guard_pivot_case"),
+)
+
+# Opening (BF_S0) move anchored to the most obvious red flag
+_RED_FLAG_TO_INTENT = {
+    "OTP_REQUEST": INT_REFUSE_SENSITIVE_ONCE,
+    "SUSPICIOUS_LINK": INT_ASK_OFFICIAL_WEBSITE,
+    "THREAT_PRESSURE": INT_ASK_TICKET_REF,
+    "IMPERSONATION_CLAIM": INT_ASK_DEPARTMENT_BRANCH,
+    "PAYMENT_REQUEST": INT_ASK_ALT_VERIFICATION,
+}
+
+# Investigative-ladder key -> (intent, target_key)
+_LADDER_DISPATCH = {
+    "department": (INT_ASK_DEPARTMENT_BRANCH, None),
+    "phoneNumbers": (INT_ASK_OFFICIAL_HELPLINE, "phoneNumbers"),
+    "phishingLinks": (INT_ASK_OFFICIAL_WEBSITE, "phishingLinks"),
+    "upiIds": (INT_ASK_ALT_VERIFICATION, "upiIds"),
+    # No dedicated intent exists; domain/site verification is the closest safe surface.
+    "emailAddresses": (INT_ASK_OFFICIAL_WEBSITE, "emailAddresses"),
+    "caseIds": (INT_ASK_TICKET_REF, "caseIds"),
+    "policyNumbers": (INT_ASK_TICKET_REF, "policyNumbers"),
+    "orderNumbers": (INT_ASK_TICKET_REF, "orderNumbers"),
+}
+
+def _ladder_target(session, intel_dict: Dict[str, Any], turn_index: int) -> (str, str):
+    """Next ladder step (recorded on session.lastLadderTarget) mapped to an intent."""
+    ladder_key = choose_ladder_target(
+        intel_dict=intel_dict,
+        scam_type=session.scam_type,
+        asked_last_turn=_asked_map(session),
+        turn_index=turn_index,
+        cooldown_turns=4,
+        avoid_keys=_avoid_keys(session),
+    )
+    session.lastLadderTarget = ladder_key
+    pair = _LADDER_DISPATCH.get(ladder_key)
+    if pair is not None:
+        return pair
+    # Fallback to existing missing-intel selector
+    return _pick_missing_intel_target(intel_dict, session.bf_recent_intents, session.scam_type)
 
 
 # ============================================================
@@ -280,28 +461,24 @@ def choose_next_action(
     if settings is None or isinstance(settings, dict):
         settings = default_settings
 
-    def _constrain(intent: str) -> str:
-        # If a non-allowed intent is produced, pivot to a productive one
-        if intent not in _ALLOWED_INTENTS:
-            # choose a missing-intel intent based on registry
-            return _pick_missing_intel_intent(intel_dict, session.bf_recent_intents, session.scam_type)
-        return intent
-
     # ------------------------------------------------------------
     # Session defaults
     # ------------------------------------------------------------
 
-    session.bf_state = getattr(session, "bf_state", BF_S0)
-    session.bf_last_intent = getattr(session, "bf_last_intent", None)
-    session.bf_repeat_count = getattr(session, "bf_repeat_count", 0)
-    session.bf_no_progress_count = getattr(session, "bf_no_progress_count", 0)
-    session.bf_secondary_bounce_count = getattr(session, "bf_secondary_bounce_count", 0)
-    session.bf_policy_refused_once = getattr(session, "bf_policy_refused_once", False)
-    session.bf_recent_intents = getattr(session, "bf_recent_intents", [])
-    session.bf_last_ioc_signature = getattr(session, "bf_last_ioc_signature", None)
+    # The bf_* fields are declared with defaults on SessionState, so only values that can
+    # arrive as None from older stored sessions are coerced here. scam_type is the
+    # controller's undeclared alias (see session_repo migration) and is backfilled.
+    session.bf_no_progress_count = int(session.bf_no_progress_count or 0)
+    session.bf_ack_used_count = int(session.bf_ack_used_count or 0)
+    session.bf_recent_intents = session.bf_recent_intents or []
+    session.askedArtifactLastTurn = session.askedArtifactLastTurn or {}
     session.scam_type = getattr(session, "scam_type", "UNKNOWN")
-    session.bf_ack_used_count = int(getattr(session, "bf_ack_used_count", 0) or 0)
     recent = session.bf_recent_intents[-_RECENT_WINDOW:]
+    # Read once; the cooldown/ladder helpers below take it explicitly
+    turn_index = int(getattr(session, "turnIndex", 0) or 0)
+    # Categories several gates below key on (intel_dict is not mutated during the call)
+    got_phone = bool(intel_dict.get("phoneNumbers"))
+    got_link = bool(intel_dict.get("phishingLinks"))
 
     # ------------------------------------------------------------
     # Rubric catch-up rail (Conversation Quality) [1]
@@ -314,7 +491,7 @@ def choose_next_action(
         cq_turns_target = int(getattr(settings, "CQ_MIN_TURNS", 8) or 8)
         cq_rel_target = int(getattr(settings, "CQ_MIN_RELEVANT_QUESTIONS", 3) or 3)
         cq_elic_max = int(getattr(settings, "CQ_MAX_ELICITATION_ATTEMPTS", 5) or 5)
-        turns = int(getattr(session, "turnIndex", 0) or 0)
+        turns = turn_index
         rel = int(getattr(session, "cqRelevantQuestions", 0) or 0)
         elic = int(getattr(session, "cqElicitationAttempts", 0) or 0)
 
@@ -344,16 +521,14 @@ def choose_next_action(
     # PIVOT 0: Early boundary refusal if OTP/PIN appears and we haven't refused once.
     # This improves realism and safety without revealing detection logic.
     # ------------------------------------------------------------
-    latest_lc = (latest_text or "").lower()
-    otp_in_latest = any(t in latest_lc for t in _BOUNDARY_TERMS)
+    otp_in_latest = _BOUNDARY_SEARCH(latest_text or "") is not None
     if otp_in_latest and not session.bf_policy_refused_once:
         intent = INT_REFUSE_SENSITIVE_ONCE
         session.bf_policy_refused_once = True
-        intent = _constrain(intent)
+        intent = _constrain(intent, intel_dict, session.bf_recent_intents, session.scam_type)
         session.bf_last_intent = intent
         session.bf_recent_intents.append(intent)
-        if len(session.bf_recent_intents) > 10:
-            session.bf_recent_intents.pop(0)
+        del session.bf_recent_intents[:-_RECENT_HISTORY_MAX]
         # Early return to enforce boundary once
         return {
             "bf_state": session.bf_state,
@@ -367,18 +542,20 @@ def choose_next_action(
     # ------------------------------------------------------------
     # IOC Progress Detection
     # ------------------------------------------------------------
+    # Thresholds used by several gates below, read once per call
+    no_progress_limit = settings.BF_NO_PROGRESS_TURNS
+    no_new_limit = int(getattr(settings, "NO_NEW_IOC_TURNS", 2) or 2)
+    min_turns = int(getattr(settings, "CQ_MIN_TURNS", 8) or 8)
+
     # Stronger escalation when there is sustained no-progress
     # If we've exceeded 2x the no-progress threshold, step up to SECONDARY_FAIL (non-terminal).
-    try:
-        if session.bf_no_progress_count >= (settings.BF_NO_PROGRESS_TURNS * 2):
-            session.bf_state = BF_S4  # controlled failure surface
-    except Exception:
-        pass
+    if session.bf_no_progress_count >= (no_progress_limit * 2):
+        session.bf_state = BF_S4  # controlled failure surface
 
     new_signature = compute_ioc_signature(intel_dict)
     # Correct definition: "new intel" iff signature changed since last turn.
     # Do NOT treat "any existing intel" as new every turn, or no-progress never triggers.
-    prev_sig = getattr(session, "bf_last_ioc_signature", None)
+    prev_sig = session.bf_last_ioc_signature
     
     if not prev_sig:
         # First turn or previously empty: treat as new to initialize state/counters
@@ -401,88 +578,37 @@ def choose_next_action(
     
     # ✅ NO-NEW-IOC Pivot: if stagnant for N turns, force a pivot to new intel
     try:
-        no_new_limit = int(getattr(settings, "NO_NEW_IOC_TURNS", 2) or 2)
-        if session.bf_no_progress_count >= no_new_limit and session.bf_no_progress_count < settings.BF_NO_PROGRESS_TURNS:
+        if session.bf_no_progress_count >= no_new_limit and session.bf_no_progress_count < no_progress_limit:
              # Pivot to something missing
              intent, target_key = _pick_missing_intel_target(intel_dict, session.bf_recent_intents, session.scam_type)
              reason = "no_new_ioc_pivot"
     except Exception:
         pass
 
-    # ------------------------------------------------------------
-    # Anti-redundancy helpers (category cooldown + satisfied guard)
-    # ------------------------------------------------------------
-    def _has_vals(key: str) -> bool:
-        try:
-            vals = intel_dict.get(key) or []
-            return isinstance(vals, list) and len(vals) > 0
-        except Exception:
-            return False
-
-    def _asked_map() -> Dict[str, int]:
-        try:
-            return getattr(session, "askedArtifactLastTurn", {}) or {}
-        except Exception:
-            return {}
-
-    def _avoid_keys() -> List[str]:
-        try:
-            return list(getattr(session, "lastNewIocKeys", []) or [])
-        except Exception:
-            return []
-
-    def _cooldown_block(key: str, window_turns: int = 4) -> bool:
-        """
-        Prevent repeatedly asking the same category too soon.
-        window_turns counts in session.turnIndex units (which includes both sides).
-        """
-        try:
-            last_map = getattr(session, "askedArtifactLastTurn", {}) or {}
-            last = int(last_map.get(key, -10**9))
-            now = int(getattr(session, "turnIndex", 0) or 0)
-            return (now - last) < int(window_turns)
-        except Exception:
-            return False
-
-    def _mark_asked(key: str) -> None:
-        try:
-            m = dict(getattr(session, "askedArtifactLastTurn", {}) or {})
-            m[key] = int(getattr(session, "turnIndex", 0) or 0)
-            session.askedArtifactLastTurn = m
-        except Exception:
-            pass
-
     # ------------------------------------------------------------
     # State Advancement via Intel
     # ------------------------------------------------------------
 
+    # Intel only ever moves the state forward: to at least S4 / S3 / S2
     if new_intel_received:
         if intel_dict.get("upiIds") or intel_dict.get("bankAccounts"):
-            if session.bf_state in (BF_S0, BF_S1, BF_S2, BF_S3):
-                session.bf_state = BF_S4
-        elif intel_dict.get("phoneNumbers"):
-            if session.bf_state in (BF_S0, BF_S1, BF_S2):
-                session.bf_state = BF_S3
-        elif intel_dict.get("phishingLinks"):
-            if session.bf_state in (BF_S0, BF_S1):
-                session.bf_state = BF_S2
+            session.bf_state = _advance_to(session.bf_state, BF_S4)
+        elif got_phone:
+            session.bf_state = _advance_to(session.bf_state, BF_S3)
+        elif got_link:
+            session.bf_state = _advance_to(session.bf_state, BF_S2)
 
     # ------------------------------------------------------------
     # Loop Breaking
     # ------------------------------------------------------------
 
-    if session.bf_state == BF_S1:
-        session.bf_state = BF_S2
-    elif session.bf_state == BF_S2 and session.bf_no_progress_count >= settings.BF_NO_PROGRESS_TURNS:
-        session.bf_state = BF_S3
-    elif session.bf_state == BF_S3 and session.bf_no_progress_count >= settings.BF_NO_PROGRESS_TURNS:
-        if session.bf_secondary_bounce_count < settings.BF_SECONDARY_BOUNCE_LIMIT:
-            session.bf_state = BF_S4
-            session.bf_secondary_bounce_count += 1
-        else:
-            session.bf_state = BF_S5
-    elif session.bf_state == BF_S4 and session.bf_no_progress_count >= settings.BF_NO_PROGRESS_TURNS:
-        session.bf_state = BF_S5
+    session.bf_state, session.bf_secondary_bounce_count = _break_loop(
+        session.bf_state,
+        session.bf_no_progress_count,
+        session.bf_secondary_bounce_count,
+        no_progress_limit,
+        settings.BF_SECONDARY_BOUNCE_LIMIT,
+    )
 
     # ------------------------------------------------------------
     # Intent Selection (Scam-aware)
@@ -491,91 +617,15 @@ def choose_next_action(
     if session.bf_state == BF_S0:
         # Start with an investigative move anchored to the most obvious red-flag
         session.bf_state = BF_S1
-        if (red_flag or "").upper() == "OTP_REQUEST":
-            intent = INT_REFUSE_SENSITIVE_ONCE
-        elif (red_flag or "").upper() == "SUSPICIOUS_LINK":
-            intent = INT_ASK_OFFICIAL_WEBSITE
-        elif (red_flag or "").upper() == "THREAT_PRESSURE":
-            intent = INT_ASK_TICKET_REF
-        elif (red_flag or "").upper() == "IMPERSONATION_CLAIM":
-            intent = INT_ASK_DEPARTMENT_BRANCH
-        elif (red_flag or "").upper() == "PAYMENT_REQUEST":
-            intent = INT_ASK_ALT_VERIFICATION
-        else:
-            # Default: ask for official helpline to verify identity
-            intent = INT_ASK_OFFICIAL_HELPLINE
-    elif session.bf_state == BF_S1:
-        # Scoring-optimized: use investigative ladder for variety + relevance. [1](https://kcetvnrorg-my.sharepoint.com/personal/24ucs160_kamarajengg_edu_in/Documents/Microsoft%20Copilot%20Chat%20Files/logs.txt)[2](https://kcetvnrorg-my.sharepoint.com/personal/24ucs160_kamarajengg_edu_in/Documents/Microsoft%20Copilot%20Chat%20Files/logs.1771597261347.log)
-        ladder_key = choose_ladder_target(
-            intel_dict=intel_dict,
-            scam_type=session.scam_type,
-            asked_last_turn=_asked_map(),
-            turn_index=int(getattr(session, "turnIndex", 0) or 0),
-            cooldown_turns=4,
-            avoid_keys=_avoid_keys(),
-        )
-        session.lastLadderTarget = ladder_key
-        if ladder_key == "department":
-            intent, target_key = INT_ASK_DEPARTMENT_BRANCH, None
-        elif ladder_key == "phoneNumbers":
-            intent, target_key = INT_ASK_OFFICIAL_HELPLINE, "phoneNumbers"
-        elif ladder_key == "phishingLinks":
-            intent, target_key = INT_ASK_OFFICIAL_WEBSITE, "phishingLinks"
-        elif ladder_key == "upiIds":
-            intent, target_key = INT_ASK_ALT_VERIFICATION, "upiIds"
-        elif ladder_key == "emailAddresses":
-            # No dedicated intent exists; domain/site verification is the closest safe surface.
-            intent, target_key = INT_ASK_OFFICIAL_WEBSITE, "emailAddresses"
-        elif ladder_key == "caseIds":
-            intent, target_key = INT_ASK_TICKET_REF, "caseIds"
-        elif ladder_key == "policyNumbers":
-            intent, target_key = INT_ASK_TICKET_REF, "policyNumbers"
-        elif ladder_key == "orderNumbers":
-            intent, target_key = INT_ASK_TICKET_REF, "orderNumbers"
-        else:
-            # Fallback to existing missing-intel selector
-            intent, target_key = _pick_missing_intel_target(
-                intel_dict,
-                session.bf_recent_intents,
-                session.scam_type,
-            )
+        # Default: ask for official helpline to verify identity
+        intent = _RED_FLAG_TO_INTENT.get((red_flag or "").upper(), INT_ASK_OFFICIAL_HELPLINE)
     elif session.bf_state in (BF_S2, BF_S3, BF_S4):
         # Use ladder in deeper states too, to avoid repetitive cycles and keep engagement varied. [1](https://kcetvnrorg-my.sharepoint.com/personal/24ucs160_kamarajengg_edu_in/Documents/Microsoft%20Copilot%20Chat%20Files/logs.txt)[2](https://kcetvnrorg-my.sharepoint.com/personal/24ucs160_kamarajengg_edu_in/Documents/Microsoft%20Copilot%20Chat%20Files/logs.1771597261347.log)
-        ladder_key = choose_ladder_target(
-            intel_dict=intel_dict,
-            scam_type=session.scam_type,
-            asked_last_turn=_asked_map(),
-            turn_index=int(getattr(session, "turnIndex", 0) or 0),
-            cooldown_turns=4,
-            avoid_keys=_avoid_keys(),
-        )
-        session.lastLadderTarget = ladder_key
-        if ladder_key == "department":
-            intent, target_key = INT_ASK_DEPARTMENT_BRANCH, None
-        elif ladder_key == "phoneNumbers":
-            intent, target_key = INT_ASK_OFFICIAL_HELPLINE, "phoneNumbers"
-        elif ladder_key == "phishingLinks":
-            intent, target_key = INT_ASK_OFFICIAL_WEBSITE, "phishingLinks"
-        elif ladder_key == "upiIds":
-            intent, target_key = INT_ASK_ALT_VERIFICATION, "upiIds"
-        elif ladder_key == "emailAddresses":
-            intent, target_key = INT_ASK_OFFICIAL_WEBSITE, "emailAddresses"
-        elif ladder_key == "caseIds":
-            intent, target_key = INT_ASK_TICKET_REF, "caseIds"
-        elif ladder_key == "policyNumbers":
-            intent, target_key = INT_ASK_TICKET_REF, "policyNumbers"
-        elif ladder_key == "orderNumbers":
-            intent, target_key = INT_ASK_TICKET_REF, "orderNumbers"
-        else:
-            intent, target_key = _pick_missing_intel_target(
-                intel_dict,
-                session.bf_recent_intents,
-                session.scam_type,
-            )
+        # BF_S1 never reaches selection (loop breaking always advances it to BF_S2), so this is
+        # the single ladder call per turn.
+        intent, target_key = _ladder_target(session, intel_dict, turn_index)
 
         # Progression once some intel exists
-        got_phone = bool(intel_dict.get("phoneNumbers"))
-        got_link  = bool(intel_dict.get("phishingLinks"))
         asked_ticket_recently = INT_ASK_TICKET_REF in recent
         asked_dept_recently   = INT_ASK_DEPARTMENT_BRANCH in recent
 
@@ -600,12 +650,12 @@ def choose_next_action(
             # while still allowing deterministic termination (no-progress/repeat/max-turns elsewhere).
             if scam_ok:
                 exp_cov = _expected_iocs_covered(intel_dict, session.scam_type)
-                if exp_cov and turns >= int(getattr(settings, "CQ_MIN_TURNS", 8) or 8):
+                if exp_cov and turns >= min_turns:
                     intent = INT_CLOSE_AND_VERIFY_SELF
                     target_key = None
                     force_finalize = True
                     reason = CTRL_REASON_EXPECTED_IOCS
-                elif ioc_cnt >= settings.FINALIZE_MIN_IOC_CATEGORIES and turns >= int(getattr(settings, "CQ_MIN_TURNS", 8) or 8):
+                elif ioc_cnt >= settings.FINALIZE_MIN_IOC_CATEGORIES and turns >= min_turns:
                     intent = INT_CLOSE_AND_VERIFY_SELF
                     target_key = None
                     force_finalize = True
@@ -613,12 +663,11 @@ def choose_next_action(
         except Exception:
             pass
 
-        intent = _constrain(intent)
+        intent = _constrain(intent, intel_dict, session.bf_recent_intents, session.scam_type)
 
         # ✅ NO-NEW-IOC Pivot Override: If we are stagnant on intel, force a shift to a missing target
         # unless we are already finalizing or ACK-gating handles it.
         try:
-            no_new_limit = int(getattr(settings, "NO_NEW_IOC_TURNS", 2) or 2)
             # Only trigger if not already finalizing and we have stagnant progress
             if (not force_finalize) and session.bf_no_progress_count >= no_new_limit:
                 # Pick a target that is strictly missing from intel
@@ -628,7 +677,7 @@ def choose_next_action(
                     intent = piv_intent
                     target_key = piv_key
                     reason = "no_new_ioc_pivot"
-                    intent = _constrain(intent)
+                    intent = _constrain(intent, intel_dict, session.bf_recent_intents, session.scam_type)
         except Exception:
             pass
 
@@ -636,7 +685,7 @@ def choose_next_action(
         # Fix B: ACK gating (allow INT_ACK_CONCERN at most once per session)
         # ------------------------------------------------------------
         if intent == INT_ACK_CONCERN:
-            if int(getattr(session, "bf_ack_used_count", 0) or 0) >= 1:
+            if session.bf_ack_used_count >= 1:
                 # Pivot away from ACK to a productive, IOC-eliciting intent
                 intent, target_key = _pick_missing_intel_target(
                     intel_dict,
@@ -645,14 +694,13 @@ def choose_next_action(
                 )
                 reason = "ack_gated_pivot"
             else:
-                session.bf_ack_used_count = int(getattr(session, "bf_ack_used_count", 0) or 0) + 1
+                session.bf_ack_used_count += 1
                 reason = reason or "ack_allowed_once"
 
         # ----------------------------
         # Group B: OTP pressure (even if phone exists)
         # ----------------------------
         otp_recent = _otp_pressure_count(session, _OTP_PRESSURE_WINDOW)
-        got_phone = bool(intel_dict.get("phoneNumbers"))
         
         # ✅ State-aware threshold: if escalated (S4/S5), lower tolerance
         is_escalated = (session.bf_state in (BF_S4, BF_S5))
@@ -671,10 +719,11 @@ def choose_next_action(
         # ----------------------------
         # Group B: ALT satisfaction & semantic cooldown
         # ----------------------------
-        recent_full: List[str] = list(getattr(session, "bf_recent_intents", []) or [])
+        recent_full: List[str] = session.bf_recent_intents or []
         if intent == INT_ASK_ALT_VERIFICATION:
-            # 1) Satisfied suppression: if phone or link already present, avoid ALT
-            if _alt_satisfied(intel_dict):
+            # 1) Satisfied suppression: ALT typically yields a phone or link; if either is
+            #    already present, avoid ALT
+            if got_phone or got_link:
                 asked_ticket_recently = INT_ASK_TICKET_REF in recent
                 asked_dept_recently = INT_ASK_DEPARTMENT_BRANCH in recent
                 if not asked_ticket_recently:
@@ -747,33 +796,30 @@ def choose_next_action(
             session.scam_type,
         )
         reason = "ack_repetition_breaker"
-        intent = _constrain(intent)
+        intent = _constrain(intent, intel_dict, session.bf_recent_intents, session.scam_type)
 
     # ------------------------------------------------------------
     # Anti-redundancy: satisfied-category guard (pivot away)
     # ------------------------------------------------------------
-    if intent == INT_ASK_OFFICIAL_HELPLINE and _has_vals("phoneNumbers"):
-        intent, target_key = _pivot_intent(intel_dict, session.bf_recent_intents, intent, session.scam_type)
-        reason = "satisfied_guard_pivot_phone"
-    if intent == INT_ASK_OFFICIAL_WEBSITE and _has_vals("phishingLinks"):
-        intent, target_key = _pivot_intent(intel_dict, session.bf_recent_intents, intent, session.scam_type)
-        reason = "satisfied_guard_pivot_link"
-    if intent == INT_ASK_TICKET_REF and _has_vals("caseIds"):
-        intent, target_key = _pivot_intent(intel_dict, session.bf_recent_intents, intent, session.scam_type)
-        reason = "satisfied_guard_pivot_case"
+    # In order, without break: a pivot may land on a later guard's intent, which then
+    # gets the same check.
+    for guard_intent, satisfied_key, guard_reason in _SATISFIED_GUARDS:
+        if intent == guard_intent and _has_vals(intel_dict, satisfied_key):
+            intent, target_key = _pivot_intent(intel_dict, session.bf_recent_intents, intent, session.scam_type)
+            reason = guard_reason
 
     # ------------------------------------------------------------
     # Anti-redundancy: category cooldown (avoid asking same target_key too soon)
     # ------------------------------------------------------------
-    if target_key and _cooldown_block(target_key, window_turns=4):
+    if target_key and _cooldown_block(session, target_key, turn_index, window_turns=4):
         intent, target_key = _pivot_intent(intel_dict, session.bf_recent_intents, intent, session.scam_type)
         reason = "category_cooldown_pivot"
 
     # Record the asked category for future cooldown checks
     if target_key:
-        _mark_asked(target_key)
+        _mark_asked(session, target_key, turn_index)
     elif intent == INT_ASK_DEPARTMENT_BRANCH:
-        _mark_asked("department")
+        _mark_asked(session, "department", turn_index)
 
     # ------------------------------------------------------------
 
@@ -3,10 +3,12 @@ from typing import Optional
 from app.observability.logging import log
 from app.settings import settings
 
-def enqueue_guvi_final_result(session, finalize_reason: Optional[str] = None) -> None:
+def enqueue_guvi_final_result(session, finalize_reason: Optional[str] = None, payload_bytes: Optional[bytes] = None) -> None:
     """
     Enqueue the new Group‑D callback path.
     Uses lazy imports to avoid circular dependencies with orchestrator/jobs.
+    payload_bytes: serialized finalReport from the same finalization, reused as the
+    inline send's body (RQ retries re-read finalReport from the session).
     """
     if not settings.ENABLE_GUVI_CALLBACK:
         return
@@ -46,6 +48,7 @@ def enqueue_guvi_final_result(session, finalize_reason: Optional[str] = None) ->
                 session.sessionId,
                 deadline_sec=float(getattr(settings, "FINAL_OUTPUT_DEADLINE_SEC", 8.0) or 8.0),
                 max_retries=int(getattr(settings, "FINAL_OUTPUT_SYNC_RETRIES", 1) or 1),
+                body=payload_bytes,
             )
             if ok:
                 try:
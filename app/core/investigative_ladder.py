@@ -11,6 +11,7 @@ Purpose:
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any, List, Optional
 
 
@@ -39,6 +40,7 @@ LADDER_BY_SCAMTYPE: Dict[str, LadderPlan] = {
 }
 
 
+@lru_cache(maxsize=64)  # pure; detector emits a handful of distinct labels
 def normalize_scam_type(raw: str) -> str:
     """
     Normalize to the keys above.
@@ -12,7 +12,7 @@ Orchestrator Invariants (Non-Negotiable)
 import time
 from typing import List, Dict, Any
 from app.llm.detector import detect_scam
-from app.store.session_repo import load_session, save_session
+from app.store.session_repo import load_session, save_session, load_session_fields
 from app.core.broken_flow_controller import choose_next_action
 from app.llm.responder import generate_agent_reply
 from app.core.finalize import should_finalize
@@ -31,8 +31,7 @@ import hashlib
 from datetime import datetime
 from app.utils.time import parse_timestamp_ms, now_ms, compute_engagement_seconds
 from app.utils.lock import session_lock
-from app.callback.payloads import build_final_payload
-import json
+from app.callback.payloads import build_final_payload_bytes
 from app.store.redis_conn import get_redis
 import app.observability.metrics as metrics
 
@@ -334,12 +333,14 @@ def handle_event(req):
         # --- Track recent intents for cooldown/loop prevention ---
         try:
             session.bf_last_intent = intent
-            recent = list(getattr(session, "bf_recent_intents", []) or [])
+            recent = getattr(session, "bf_recent_intents", None)
+            if not isinstance(recent, list):
+                recent = session.bf_recent_intents = list(recent or [])
             # Avoid back-to-back duplicates; duplicates distort cooldown windows.
             if not recent or recent[-1] != intent:
                 recent.append(intent)
-            # keep only the last 10 to cap memory
-            session.bf_recent_intents = recent[-10:]
+            # keep only the last 10 to cap memory (trimmed in place, no copies)
+            del recent[:-10]
         except Exception:
             pass
 
@@ -380,9 +381,9 @@ def handle_event(req):
                 # If controller gave us the same intent again, force a pivot by adding it to recent intents
                 if intent2 == intent:
                     # simulate avoidance: extend recent intent history temporarily and re-choose
-                    tmp_recent = list(getattr(session, "bf_recent_intents", []) or [])
-                    tmp_recent.append(intent)
-                    session.bf_recent_intents = tmp_recent[-10:]
+                    recent = session.bf_recent_intents
+                    recent.append(intent)
+                    del recent[:-10]
                     controller_out2 = choose_next_action(
                         session=session,
                         latest_text=req.message.text or "",
@@ -474,8 +475,8 @@ def handle_event(req):
         try:
             session.engagementDurationSeconds = compute_engagement_seconds(
                 session.conversation or [],
-                first_seen_ms=int(getattr(session, "sessionFirstSeenAtMs", 0) or 0),
-                last_seen_ms=int(getattr(session, "sessionLastSeenAtMs", 0) or 0),
+                first_seen_ms=int(session.sessionFirstSeenAtMs or 0),
+                last_seen_ms=int(session.sessionLastSeenAtMs or 0),
             )
         except Exception:
             # retain existing value if any
@@ -486,8 +487,8 @@ def handle_event(req):
             log(
                 event="engagement_snapshot",
                 sessionId=session.sessionId,
-                durationSec=int(getattr(session, "engagementDurationSeconds", 0) or 0),
-                turns=int(getattr(session, "turnIndex", 0) or 0),
+                durationSec=int(session.engagementDurationSeconds or 0),
+                turns=int(session.turnIndex or 0),
                 messages=len(session.conversation or []),
             )
         except Exception:
@@ -501,15 +502,15 @@ def handle_event(req):
                 log(
                     event="finalize_snapshot",
                     sessionId=session.sessionId,
-                    firstSeenMs=int(getattr(session, "sessionFirstSeenAtMs", 0) or 0),
-                    lastSeenMs=int(getattr(session, "sessionLastSeenAtMs", 0) or 0),
-                    durationSec=int(getattr(session, "engagementDurationSeconds", 0) or 0),
-                    turnsEngaged=int(getattr(session, "turnsEngaged", 0) or 0),
+                    firstSeenMs=int(session.sessionFirstSeenAtMs or 0),
+                    lastSeenMs=int(session.sessionLastSeenAtMs or 0),
+                    durationSec=int(session.engagementDurationSeconds or 0),
+                    turnsEngaged=int(session.turnsEngaged or 0),
                 )
             except Exception:
                 pass
             # Keep counters synced for callback payload
-            session.totalMessagesExchanged = int(getattr(session, "turnIndex", 0) or 0)
+            session.totalMessagesExchanged = int(session.turnIndex or 0)
 
             # Mark lifecycle and enqueue callback
             session.state = "READY_TO_REPORT"
@@ -518,38 +519,49 @@ def handle_event(req):
             try:
                 # 1) Generate reportId and freeze report
                 metrics.increment_finalize_attempt()
-                seq = int(getattr(session, "reportSequence", 0) or 0) + 1
+                seq = int(session.reportSequence or 0) + 1
                 session.reportSequence = seq
                 session.reportId = f"{session.sessionId}:{seq}"
                 
                 # 2) Build final report
-                final_payload = build_final_payload(session)
+                final_payload, final_payload_bytes = build_final_payload_bytes(session)
                 session.finalReport = final_payload
+                session.finalReportFingerprint = final_payload["extractedIntelligence"]["_meta"].get("payloadFingerprint")
                 session.finalizedAt = now_ms()
                 session.state = "FINALIZED"
                 
-                # --- Objective 1: Update SLO metrics ---
+                # --- Objective 1 (SLO metrics) + Objective 3 (last callback payload for debug) ---
+                # Persist the frozen report, the debug copy (SET EX) and the SLO counters in
+                # one pipelined round-trip, *before* dispatch: the outbox processor reloads
+                # the session from Redis and must see finalReport.
                 try:
-                    metrics.increment_finalize_success()
-                    if session.sessionFirstSeenAtMs and int(session.sessionFirstSeenAtMs) > 0:
-                        metrics.record_finalize_latency(now_ms() - int(session.sessionFirstSeenAtMs))
-                except Exception:
-                    pass
-
-                # --- Objective 3: Persist last callback payload for debug ---
-                if settings.STORE_LAST_CALLBACK_PAYLOAD:
-                    try:
-                        get_redis().set(
+                    pipe = get_redis().pipeline(transaction=False)
+                    save_session(session, pipe=pipe)
+                    if settings.STORE_LAST_CALLBACK_PAYLOAD:
+                        pipe.set(
                             f"session:{session.sessionId}:last_callback_payload",
-                            json.dumps(final_payload),
+                            final_payload_bytes,
                             ex=86400
                         )
-                    except Exception:
-                        pass
+                    metrics.increment_finalize_success(pipe=pipe)
+                    if session.sessionFirstSeenAtMs and int(session.sessionFirstSeenAtMs) > 0:
+                        metrics.record_finalize_latency(now_ms() - int(session.sessionFirstSeenAtMs), pipe=pipe)
+                    pipe.execute()
+                except Exception:
+                    pass
                 
                 # 3) Pass through the controller's reason so evaluator sees the specific gate
-                enqueue_guvi_final_result(session, finalize_reason=finalize_reason)
+                # The wire bytes just built ride along to the inline (sync/hybrid) send
+                enqueue_guvi_final_result(session, finalize_reason=finalize_reason, payload_bytes=final_payload_bytes)
                 # callbackStatus is now set by hybrid dispatcher (sent/queued/failed)
+                # The outbox processor persisted its own ledger; carry it over so the
+                # save below does not clobber it with this (older) in-memory copy.
+                try:
+                    stored_ledger = load_session_fields(session.sessionId, ("outboxEntry",))["outboxEntry"]
+                    if stored_ledger:
+                        session.outboxEntry = stored_ledger
+                except Exception:
+                    pass
             except Exception:
                 session.callbackStatus = "failed"
             # Persist session (kept as-is)
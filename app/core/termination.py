@@ -24,24 +24,22 @@ def _ioc_category_count(session) -> int:
     INVARIANT: Only registry-defined keys are valid for completion logic.
     """
     intel = session.extractedIntelligence
+    # Dynamic add-ons bucket, resolved once rather than per registry key
+    dyn = getattr(intel, "dynamicArtifacts", None)
+    if not isinstance(dyn, dict):
+        dyn = {}
     count = 0
-    # Use registry to determine which keys to check
-    for key in artifact_registry.artifacts.keys():
+    # Use registry to determine which keys to check (read live: artifacts can register at runtime)
+    for key in artifact_registry.artifacts:
         # 1) static fields on Intelligence
-        if hasattr(intel, key):
-            vals = getattr(intel, key)
-            if isinstance(vals, list) and len(vals) > 0:
-                count += 1
-                continue
+        vals = getattr(intel, key, None)
+        if isinstance(vals, list) and len(vals) > 0:
+            count += 1
+            continue
         # 2) dynamic add-ons bucket
-        try:
-            dyn = getattr(intel, "dynamicArtifacts", None)
-            if isinstance(dyn, dict):
-                vals2 = dyn.get(key)
-                if isinstance(vals2, list) and len(vals2) > 0:
-                    count += 1
-        except Exception:
-            pass
+        vals2 = dyn.get(key)
+        if isinstance(vals2, list) and len(vals2) > 0:
+            count += 1
     return count
 
 def decide_termination(*, session, controller_out: Optional[Dict[str, Any]] = None) -> Optional[str]:
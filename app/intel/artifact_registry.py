@@ -1,4 +1,5 @@
 import re
+import sys
 import time
 import json
 from typing import Match
@@ -258,9 +259,13 @@ class ArtifactRegistry:
         self._last_refresh = 0
         # NEW: dynamic intent map (IOC key -> {intent, instruction})
         self.intent_map: Dict[str, Dict[str, Any]] = {}
+        # Bumped whenever specs are added or their priority/flags change, so callers can
+        # cache derived orderings (e.g. the controller's per-scam-type sorted specs).
+        self.version = 0
 
     def register(self, spec: ArtifactSpec):
         self.artifacts[spec.key] = spec
+        self.version += 1
         # Capture defaults for overridable fields
         self._defaults[spec.key] = {
             "enabled": getattr(spec, "enabled", True),
@@ -355,6 +360,7 @@ class ArtifactRegistry:
                     passive_only=passive_only,
                     enabled=enabled,
                 ))
+        self.version += 1
 
     def extract_all(self, text: str) -> Dict[str, List[str]]:
         self._maybe_refresh_overrides()
@@ -456,8 +462,11 @@ class ArtifactRegistry:
                         cleaned = {}
                         for k, v in im.items():
                             if isinstance(v, dict):
+                                intent = v.get("intent")
                                 cleaned[k] = {
-                                    "intent": v.get("intent"),
+                                    # Interned like the INT_* literals, so controller
+                                    # equality/set checks stay identity fast-paths
+                                    "intent": sys.intern(intent) if isinstance(intent, str) else intent,
                                     "instruction": v.get("instruction"),
                                 }
                         self.intent_map = cleaned
@@ -487,6 +496,7 @@ class ArtifactRegistry:
                     spec.ask_enabled = bool(ov["ask_enabled"])
                 if "passive_only" in ov:
                     spec.passive_only = bool(ov["passive_only"])
+        self.version += 1
 
 artifact_registry = ArtifactRegistry()
 
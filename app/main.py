@@ -1,7 +1,7 @@
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.routes import router
+from app.api.routes import router, CompatPathMiddleware
 from app.api.admin_routes import router as admin_router
 from app.integrations.twilio_routes import router as twilio_router
 from app.settings import settings
@@ -21,6 +21,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Rewrite alias POST/GET paths (/honeypot, /detect, /api/detect) to /api/honeypot
+app.add_middleware(CompatPathMiddleware)
+
 app.include_router(router)
 app.include_router(admin_router)
 app.include_router(twilio_router)
@@ -1,6 +1,8 @@
 import json
+import sys
 import time
 from app.settings import settings
+from app.utils import jsonfast
 
 # Simple redaction patterns for logs (if PII redaction enabled)
 SENSITIVE_KEYS = {"text", "message", "reply", "payload", "content"}
@@ -12,26 +14,70 @@ def _redact_value(v):
         return {k: _redact_value(val) for k, val in v.items()}
     return v
 
-def log(event: str, **fields):
-    payload = {"ts": int(time.time()), "event": event}
-    
-    if settings.ENABLE_PII_REDACTION:
-        # Redact sensitive fields
-        clean_fields = {}
-        for k, v in fields.items():
-            if k in SENSITIVE_KEYS:
-                clean_fields[k] = _redact_value(v)
-            elif isinstance(v, dict):
-                # Recursive redaction for nested objects like 'payload'
-                # If key is sensitive, redact whole value; else redact nested sensitive keys
-                if k in SENSITIVE_KEYS:
-                    clean_fields[k] = _redact_value(v)
-                else:
-                    clean_fields[k] = {sk: (_redact_value(sv) if sk in SENSITIVE_KEYS else sv) for sk, sv in v.items()}
-            else:
-                clean_fields[k] = v
-        payload.update(clean_fields)
-    else:
-        payload.update(fields)
+def _clean(fields: dict) -> dict:
+    if not settings.ENABLE_PII_REDACTION:
+        return fields
+    # Redact sensitive fields
+    clean_fields = {}
+    for k, v in fields.items():
+        if k in SENSITIVE_KEYS:
+            clean_fields[k] = _redact_value(v)
+        elif isinstance(v, dict):
+            # Recursive redaction for nested objects like 'payload'
+            # If key is sensitive, redact whole value; else redact nested sensitive keys
+            clean_fields[k] = {sk: (_redact_value(sv) if sk in SENSITIVE_KEYS else sv) for sk, sv in v.items()}
+        else:
+            clean_fields[k] = v
+    return clean_fields
 
+def _emit(event: str, context: dict, fields: dict):
+    payload = {"ts": int(time.time()), "event": event}
+    payload.update(context)
+    payload.update(_clean(fields))
     print(json.dumps(payload, ensure_ascii=False))
+
+def log(event: str, **fields):
+    _emit(event, {}, fields)
+
+def bind(**context):
+    """
+    Logger with fixed context (e.g. sessionId) for call sites that log several events
+    for the same entity. The context is redacted once here rather than on every call:
+    bound = bind(sessionId=sid); bound("callback_delivered", attempt=2)
+    """
+    context = _clean(context)
+
+    def bound(event: str, **fields):
+        _emit(event, context, fields)
+
+    return bound
+
+
+_SUPPRESSED = ("", frozenset())  # (raw LOG_SUPPRESSED_EVENTS, parsed names)
+
+def _suppressed(event: str) -> bool:
+    global _SUPPRESSED
+    raw = settings.LOG_SUPPRESSED_EVENTS or ""
+    if raw != _SUPPRESSED[0]:
+        _SUPPRESSED = (raw, frozenset(e.strip() for e in raw.split(",") if e.strip()))
+    return event in _SUPPRESSED[1]
+
+def log_json(event: str, **fields):
+    """
+    Hot-path variant of log(): drops suppressed events before building anything,
+    serializes with jsonfast (orjson when installed) and never raises, so call sites
+    need no try/except of their own.
+    """
+    try:
+        if _suppressed(event):
+            return
+        payload = {"ts": int(time.time()), "event": event}
+        payload.update(_clean(fields))
+        try:
+            line = jsonfast.dumps(payload).decode("utf-8")
+        except TypeError:
+            # e.g. non-str dict keys or objects orjson cannot encode
+            line = json.dumps(payload, ensure_ascii=False, default=str)
+        sys.stdout.write(line + "\n")
+    except Exception:
+        pass
@@ -47,49 +47,50 @@ def _now_s() -> int:
     return int(time.time())
 
 # Public counters/timers (already referenced by the app; re-define idempotently)
-def increment_finalize_success() -> None:
-    r = get_redis()
+# Functions taking `pipe` stage their commands on a caller-owned Redis pipeline when given.
+def increment_finalize_success(pipe=None) -> None:
+    r = pipe if pipe is not None else get_redis()
     r.incr(K_FIN_SUCC, 1)
 
 def increment_finalize_attempt() -> None:
     r = get_redis()
     r.incr(K_FIN_ATT, 1)
 
-def record_finalize_latency(ms: int) -> None:
+def record_finalize_latency(ms: int, pipe=None) -> None:
     try:
         ms = int(ms)
     except Exception:
         return
-    r = get_redis()
+    r = pipe if pipe is not None else get_redis()
     r.lpush(K_FIN_LAT, ms)
     r.ltrim(K_FIN_LAT, 0, _MAX_SAMPLES - 1)
 
-def increment_callback_attempt() -> None:
-    r = get_redis()
+def increment_callback_attempt(pipe=None) -> None:
+    r = pipe if pipe is not None else get_redis()
     r.incr(K_CB_ATT, 1)
 
-def increment_callback_delivered() -> None:
-    r = get_redis()
+def increment_callback_delivered(pipe=None) -> None:
+    r = pipe if pipe is not None else get_redis()
     r.incr(K_CB_OK, 1)
 
-def increment_callback_failed() -> None:
-    r = get_redis()
+def increment_callback_failed(pipe=None) -> None:
+    r = pipe if pipe is not None else get_redis()
     r.incr(K_CB_FAIL, 1)
 
-def record_callback_latency(ms: int) -> None:
+def record_callback_latency(ms: int, pipe=None) -> None:
     try:
         ms = int(ms)
     except Exception:
         return
-    r = get_redis()
+    r = pipe if pipe is not None else get_redis()
     r.lpush(K_CB_LAT, ms)
     r.ltrim(K_CB_LAT, 0, _MAX_SAMPLES - 1)
 
-def record_failed_callback(session_id: str) -> None:
+def record_failed_callback(session_id: str, pipe=None) -> None:
     """Track recent failures for incident attachments."""
     if not session_id:
         return
-    r = get_redis()
+    r = pipe if pipe is not None else get_redis()
     r.lpush(K_CB_FAIL_RECENT, session_id)
     r.ltrim(K_CB_FAIL_RECENT, 0, 49)  # keep last 50
 
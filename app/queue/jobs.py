@@ -1,6 +1,89 @@
-from app.callback.outbox import process_outbox_entry
+import re
+import time
+from datetime import timedelta
+
+from rq.exceptions import InvalidJobOperation
+from rq.job import Job, JobStatus
+
+from app.callback.outbox import process_outbox_entry, lease_remaining_ms
 from app.observability.logging import log
 from app.settings import settings
+from app.store.session_repo import load_session_fields
+from app.queue.rq_conn import get_queue
+from app.utils.time import now_ms
+
+# RQ job ids allow only [A-Za-z0-9_-]
+_JOB_ID_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+# Only wait inline while the retry queue is this shallow (otherwise free the worker)
+_INLINE_MAX_QUEUE_DEPTH = 8
+# A job id in one of these still has a run ahead of it; enqueueing it again runs it twice
+_LIVE_JOB_STATUSES = frozenset({JobStatus.QUEUED, JobStatus.SCHEDULED, JobStatus.STARTED, JobStatus.DEFERRED})
+
+
+def retry_job_id(session_id: str, attempt: int) -> str:
+    # One id per (session, attempt). RQ does not dedupe on it by itself: callers check
+    # retry_job_live first, and the outbox lease keeps a doubled run from re-sending.
+    return f"cb-{_JOB_ID_UNSAFE.sub('_', session_id)}-{attempt}"
+
+
+def retry_job_live(q, job_id: str) -> bool:
+    """
+    True if job_id is already queued, scheduled or running. RQ's enqueue with an
+    existing id overwrites the job and pushes it again, so callers check first.
+    """
+    try:
+        return Job(job_id, connection=q.connection).get_status() in _LIVE_JOB_STATUSES
+    except InvalidJobOperation:
+        # No such job (never enqueued, or expired)
+        return False
+
+
+def pick_dispatch_mode(delay_ms: int, queue_depth: int) -> str:
+    """
+    How to run a retry that is due in delay_ms:
+    - "rq_immediate": (nearly) due; enqueue now, no scheduler tick
+    - "inline_short_sleep": due shortly and the retry queue is idle; wait in this job
+    - "rq_scheduler": enqueue_in, never holding a worker slot for the backoff
+    """
+    if delay_ms <= int(settings.CALLBACK_MIN_RESCHEDULE_MS):
+        return "rq_immediate"
+    if delay_ms <= int(settings.CALLBACK_MAX_INLINE_MS) and queue_depth < _INLINE_MAX_QUEUE_DEPTH:
+        return "inline_short_sleep"
+    return "rq_scheduler"
+
+
+def schedule_callback_retry(session_id: str) -> int:
+    """
+    Dispatch the next attempt for the ledger's nextAttemptAt (see pick_dispatch_mode).
+    Retries go to CALLBACK_RETRY_QUEUE; first attempts stay on the primary queue.
+    Returns milliseconds the caller should wait before retrying inline, or 0 once the
+    retry has been handed to RQ (or nothing is pending).
+    """
+    ledger = load_session_fields(session_id, ("outboxEntry",))["outboxEntry"] or {}
+    if ledger.get("status") != "pending":
+        return 0
+
+    attempt = int(ledger.get("attempts", 0) or 0)
+    delay_ms = int(ledger.get("nextAttemptAt", 0) or 0) - now_ms()
+    if delay_ms <= 0:
+        # Due but not attempted: another worker holds the send lease; retry once it lapses
+        delay_ms = lease_remaining_ms(session_id)
+    job_id = retry_job_id(session_id, attempt)
+
+    q = get_queue(name=settings.CALLBACK_RETRY_QUEUE)
+    mode = pick_dispatch_mode(delay_ms, q.count)
+    if mode == "inline_short_sleep":
+        return delay_ms
+    if retry_job_live(q, job_id):
+        log(event="callback_retry_already_enqueued", sessionId=session_id, attempt=attempt, rq_job_id=job_id)
+        return 0
+    if mode == "rq_immediate":
+        q.enqueue(send_final_callback_job, session_id, job_id=job_id)
+    else:
+        q.enqueue_in(timedelta(milliseconds=delay_ms), send_final_callback_job, session_id, job_id=job_id)
+    log(event="callback_retry_enqueued", sessionId=session_id, attempt=attempt, delayMs=max(0, delay_ms), rq_job_id=job_id, mode=mode)
+    return 0
+
 
 def send_final_callback_job(session_id: str):
     """
@@ -12,9 +95,13 @@ def send_final_callback_job(session_id: str):
     try:
         log(event="callback_job_start", sessionId=session_id)
         # process_outbox_entry handles the logic, retries, and persistence.
-        # If it returns False (retry needed), we rely on RQ to retry if configured,
-        # or we could re-enqueue here. The ledger prevents duplicate sends.
-        process_outbox_entry(session_id)
+        # If it returns False (retry needed), dispatch the next attempt for the ledger's
+        # nextAttemptAt. The ledger prevents duplicate sends.
+        while not process_outbox_entry(session_id):
+            wait_ms = schedule_callback_retry(session_id)
+            if not wait_ms:
+                break
+            time.sleep(wait_ms / 1000.0)
     except Exception as e:
         log(event="callback_job_exception", sessionId=session_id, error=str(e))
         raise
@@ -1,8 +1,9 @@
+from typing import Optional
 from redis import Redis
 from rq import Queue
 from app.settings import settings
 
 
-def get_queue() -> Queue:
+def get_queue(name: Optional[str] = None) -> Queue:
     conn = Redis.from_url(settings.REDIS_URL)
-    return Queue(settings.RQ_QUEUE_NAME, connection=conn)
+    return Queue(name or settings.RQ_QUEUE_NAME, connection=conn)
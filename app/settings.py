@@ -8,6 +8,8 @@ class Settings:
 
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     RQ_QUEUE_NAME: str = os.getenv("RQ_QUEUE_NAME", "callback")
+    # Callback retries run on their own queue so a failing partner cannot flood RQ_QUEUE_NAME
+    CALLBACK_RETRY_QUEUE: str = os.getenv("CALLBACK_RETRY_QUEUE", "callbacks-retry")
 
     SCAM_THRESHOLD: float = float(os.getenv("SCAM_THRESHOLD", "0.75"))
     MAX_CONTEXT_MESSAGES: int = int(os.getenv("MAX_CONTEXT_MESSAGES", "10"))
@@ -57,6 +59,11 @@ class Settings:
     INCLUDE_DYNAMIC_ARTIFACTS_CALLBACK: bool = os.getenv(
         "INCLUDE_DYNAMIC_ARTIFACTS_CALLBACK", "false"
     ).lower() == "true"
+    # Include extractedIntelligence._signals (suspicious keywords) in the callback payload
+    # (default: false; the evaluator does not score it and it only adds bytes on the wire)
+    INCLUDE_SIGNALS_IN_CALLBACK: bool = os.getenv(
+        "INCLUDE_SIGNALS_IN_CALLBACK", "false"
+    ).lower() == "true"
 
     GUVI_CALLBACK_URL: str = os.getenv("GUVI_CALLBACK_URL", "")
     CALLBACK_TIMEOUT_SEC: int = int(os.getenv("CALLBACK_TIMEOUT_SEC", "5"))
@@ -69,13 +76,18 @@ class Settings:
     FINAL_OUTPUT_MODE: str = os.getenv("FINAL_OUTPUT_MODE", "hybrid").lower()
     FINAL_OUTPUT_DEADLINE_SEC: float = float(os.getenv("FINAL_OUTPUT_DEADLINE_SEC", "8.0"))
     FINAL_OUTPUT_SYNC_RETRIES: int = int(os.getenv("FINAL_OUTPUT_SYNC_RETRIES", "1"))
+    # Inline sends combined per process (app/callback/batch_sender.py): collection window
+    # in ms (0 = send each finalization directly) and max sessions per batch.
+    CALLBACK_BATCH_WINDOW_MS: int = int(os.getenv("CALLBACK_BATCH_WINDOW_MS", "0"))
+    CALLBACK_BATCH_MAX: int = int(os.getenv("CALLBACK_BATCH_MAX", "32"))
 
     # RC-8: hot reload period for intent-map (seconds). 0 disables refresh (cache only).
     INTENT_MAP_REFRESH_SEC: int = int(os.getenv("INTENT_MAP_REFRESH_SEC", "60"))
 
     # Group D: payload contract integrity & observability
     CALLBACK_PAYLOAD_VERSION: str = os.getenv("CALLBACK_PAYLOAD_VERSION", "1.0.0")
-    PAYLOAD_FINGERPRINT_ALGO: str = os.getenv("PAYLOAD_FINGERPRINT_ALGO", "sha256")
+    # blake2b (256-bit digest) by default; "sha256" (or any hashlib name) for consumers pinned to it
+    PAYLOAD_FINGERPRINT_ALGO: str = os.getenv("PAYLOAD_FINGERPRINT_ALGO", "blake2b")
     # Store the last payload per session under a debug key in Redis for retrieval
     STORE_LAST_CALLBACK_PAYLOAD: bool = os.getenv("STORE_LAST_CALLBACK_PAYLOAD", "true").lower() == "true"
 
@@ -89,6 +101,10 @@ class Settings:
     CALLBACK_BASE_DELAY_MS: int = int(os.getenv("CALLBACK_BASE_DELAY_MS", "1000"))
     CALLBACK_MAX_DELAY_MS: int = int(os.getenv("CALLBACK_MAX_DELAY_MS", "3600000"))
     CALLBACK_DLQ_TTL_DAYS: int = int(os.getenv("CALLBACK_DLQ_TTL_DAYS", "7"))
+    # Retry dispatch: at or below MIN enqueue immediately; up to MAX_INLINE wait in the
+    # worker when the retry queue is idle; otherwise hand off to the RQ scheduler.
+    CALLBACK_MIN_RESCHEDULE_MS: int = int(os.getenv("CALLBACK_MIN_RESCHEDULE_MS", "50"))
+    CALLBACK_MAX_INLINE_MS: int = int(os.getenv("CALLBACK_MAX_INLINE_MS", "500"))
 
     # Feature Flags (Startup & Component Guards)
     ENABLE_OUTBOX: bool = os.getenv("ENABLE_OUTBOX", "true").lower() == "true"
@@ -107,10 +123,15 @@ class Settings:
     # Objective 8: Security & Privacy
     CORS_ORIGINS: str = os.getenv("CORS_ORIGINS", "*")
     LOG_RETENTION_DAYS: int = int(os.getenv("LOG_RETENTION_DAYS", "180"))
+    # Comma-separated event names that log_json drops before serializing (e.g. chatty
+    # per-send success events in production)
+    LOG_SUPPRESSED_EVENTS: str = os.getenv("LOG_SUPPRESSED_EVENTS", "")
     EVIDENCE_RETENTION_DAYS: int = int(os.getenv("EVIDENCE_RETENTION_DAYS", "365"))
     ENABLE_PII_REDACTION: bool = os.getenv("ENABLE_PII_REDACTION", "true").lower() == "true"
     ADMIN_RBAC_ENABLED: bool = os.getenv("ADMIN_RBAC_ENABLED", "true").lower() == "true"
     # Used for rudimentary RBAC/ABAC if enabled
     ADMIN_API_KEY: str = os.getenv("ADMIN_API_KEY", "")
+    # Admin dashboard polling: in-process single-flight session cache TTL (seconds). 0 disables.
+    ADMIN_CACHE_TTL_SEC: float = float(os.getenv("ADMIN_CACHE_TTL_SEC", "2.0"))
 
 settings = Settings()
@@ -40,6 +40,7 @@ class SessionState:
     # Objective 1: FSM & Finalization
     finalizedAt: Optional[int] = None
     finalReport: Optional[dict] = None
+    finalReportFingerprint: Optional[str] = None  # extractedIntelligence._meta.payloadFingerprint
     lastIocAtMs: int = 0
     
     # Objective 2: Outbox & Report Identity
@@ -1,13 +1,27 @@
 import json
 import time
-import inspect
-from dataclasses import fields as dc_fields
+import threading
+from dataclasses import MISSING, fields as dc_fields
 from app.store.redis_conn import get_redis
+from app.settings import settings
 from app.store.models import SessionState, Intelligence
 from app.observability.logging import log  # ✅ P1.2d: migration observability
 
 PREFIX = "session:"
 
+# Declared field names, resolved once (every session load filters against them)
+_SESSION_FIELDS = frozenset(f.name for f in dc_fields(SessionState))
+_INTEL_FIELDS = frozenset(f.name for f in dc_fields(Intelligence))
+
+# Short-TTL, in-process read cache for admin/dashboard polling (see load_session_cached).
+_READ_CACHE = {}  # session_id -> (expires_at_monotonic, SessionState)
+_READ_CACHE_MAX = 1024
+_READ_CACHE_LOCK = threading.Lock()
+# Single-flight locks, striped by session id: a fixed pool, so nothing has to be
+# removed on invalidation/eviction (two sessions sharing a stripe just load in turn)
+_READ_KEY_LOCK_STRIPES = 64
+_READ_KEY_LOCKS = tuple(threading.Lock() for _ in range(_READ_KEY_LOCK_STRIPES))
+
 def _migrate_session_data(data: dict) -> dict:
     """
     Backward-compat migration for stored sessions.
@@ -18,6 +32,7 @@ def _migrate_session_data(data: dict) -> dict:
     did_drop_legacy_scam_type = False
     removed_top_fields = 0
     removed_intel_fields = 0
+    did_backfill_turn_index = False
 
     # ✅ P1.2: Harmonize scam type fields from legacy records
     # - Canonical field is 'scamType' (persisted in SessionState)
@@ -43,7 +58,7 @@ def _migrate_session_data(data: dict) -> dict:
     # ✅ P1.2c: Purge any other undeclared legacy fields (top-level and nested intelligence)
     # 1) Top-level allowlist: only keep fields that are defined on SessionState
     try:
-        allowed_top = {f.name for f in dc_fields(SessionState)}
+        allowed_top = _SESSION_FIELDS
         for k in list(data.keys()):
             if k not in allowed_top:
                 # Keep only canonical fields to avoid persisting stale debug/legacy keys
@@ -60,7 +75,7 @@ def _migrate_session_data(data: dict) -> dict:
     try:
         ei = data.get("extractedIntelligence")
         if isinstance(ei, dict):
-            allowed_ei = {f.name for f in dc_fields(Intelligence)}
+            allowed_ei = _INTEL_FIELDS
             for k in list(ei.keys()):
                 if k not in allowed_ei:
                     try:
@@ -76,23 +91,29 @@ def _migrate_session_data(data: dict) -> dict:
         convo = data.get("conversation") or []
         inferred = len(convo) if isinstance(convo, list) else 0
         data["turnIndex"] = int(legacy or inferred or 0)
+        did_backfill_turn_index = True
 
     # Sync legacy field too
     data["totalMessagesExchanged"] = int(data.get("turnIndex") or 0)
 
     # ✅ P1.2d: Emit a compact migration log line for observability
     # (Non-influential: wrapped in try to avoid impacting load path)
+    # Only when something was actually migrated: current-schema loads (the hot path,
+    # e.g. every outbox attempt) stay silent.
+    migrated = (did_backfill_scam_type or did_drop_legacy_scam_type or removed_top_fields
+                or removed_intel_fields or did_backfill_turn_index)
     try:
-        log(
-            event="session_migrated",
-            scamType=data.get("scamType") or "",
-            backfilledScamType=bool(did_backfill_scam_type),
-            droppedLegacyScamType=bool(did_drop_legacy_scam_type),
-            removedTopFields=int(removed_top_fields),
-            removedIntelFields=int(removed_intel_fields),
-            turnIndex=int(data.get("turnIndex") or 0),
-            totalMessagesExchanged=int(data.get("totalMessagesExchanged") or 0),
-        )
+        if migrated:
+            log(
+                event="session_migrated",
+                scamType=data.get("scamType") or "",
+                backfilledScamType=bool(did_backfill_scam_type),
+                droppedLegacyScamType=bool(did_drop_legacy_scam_type),
+                removedTopFields=int(removed_top_fields),
+                removedIntelFields=int(removed_intel_fields),
+                turnIndex=int(data.get("turnIndex") or 0),
+                totalMessagesExchanged=int(data.get("totalMessagesExchanged") or 0),
+            )
     except Exception:
         pass
     return data
@@ -132,14 +153,14 @@ def _filter_session_kwargs(data: dict) -> dict:
     """
     Drop unknown fields so SessionState(**kwargs) never explodes
     """
-    sig = inspect.signature(SessionState)
-    allowed = set(sig.parameters.keys())
-    return {k: v for k, v in data.items() if k in allowed}
+    return {k: v for k, v in data.items() if k in _SESSION_FIELDS}
 
 
-def load_session(session_id: str) -> SessionState:
-    r = get_redis()
-    raw = r.get(_key(session_id))
+def _decode_session(session_id: str, raw) -> SessionState:
+    """
+    Rehydrate a SessionState from its stored JSON blob (or a fresh session if missing).
+    Shared by the single-key and bulk loaders so both apply the same migration path.
+    """
     if not raw:
         s = SessionState(sessionId=session_id)
         s.lastUpdatedAtEpoch = int(time.time())
@@ -162,8 +183,100 @@ def load_session(session_id: str) -> SessionState:
 
     return SessionState(**data)
 
-def save_session(session: SessionState) -> None:
+
+def load_session(session_id: str) -> SessionState:
+    r = get_redis()
+    return _decode_session(session_id, r.get(_key(session_id)))
+
+
+def _field_default(name: str):
+    for f in dc_fields(SessionState):
+        if f.name == name:
+            if f.default_factory is not MISSING:
+                return f.default_factory()
+            return None if f.default is MISSING else f.default
+    return None
+
+
+def load_session_fields(session_id: str, fields) -> dict:
+    """
+    Read-only projection: return only the requested top-level fields of a stored
+    session, skipping migration and SessionState/Intelligence rehydration.
+    Missing fields fall back to SessionState defaults. Intended for admin/debug views
+    of fields that need no migration (e.g. callbackStatus, outboxEntry, finalReport).
+    """
+    r = get_redis()
+    raw = r.get(_key(session_id))
+    data = json.loads(raw) if raw else {}
+    return {f: (data[f] if f in data else _field_default(f)) for f in fields}
+
+
+def load_sessions_bulk(session_ids) -> list:
+    """
+    Load several sessions in a single Redis round-trip (non-transactional pipeline).
+    Returns SessionState objects in the same order as session_ids; missing sessions
+    come back as fresh SessionState instances, exactly like load_session.
+    """
+    session_ids = list(session_ids or [])
+    if not session_ids:
+        return []
     r = get_redis()
+    pipe = r.pipeline(transaction=False)
+    for sid in session_ids:
+        pipe.get(_key(sid))
+    raws = pipe.execute()
+    return [_decode_session(sid, raw) for sid, raw in zip(session_ids, raws)]
+
+def _read_key_lock(session_id: str) -> threading.Lock:
+    return _READ_KEY_LOCKS[hash(session_id) % _READ_KEY_LOCK_STRIPES]
+
+
+def load_session_cached(session_id: str, loader=None, ttl_sec: float = None) -> SessionState:
+    """
+    Read-only, single-flight session load for admin/dashboard polling.
+    Concurrent identical requests share one Redis load; results are reused for
+    ADMIN_CACHE_TTL_SEC seconds. save_session() invalidates the entry in-process.
+    Callers must treat the returned session as read-only (it may be shared).
+    """
+    loader = loader or load_session
+    ttl = float(settings.ADMIN_CACHE_TTL_SEC if ttl_sec is None else ttl_sec)
+    if ttl <= 0:
+        return loader(session_id)
+
+    hit = _READ_CACHE.get(session_id)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+
+    with _read_key_lock(session_id):
+        # Another thread may have filled the entry while we waited (single-flight)
+        hit = _READ_CACHE.get(session_id)
+        if hit and hit[0] > time.monotonic():
+            return hit[1]
+        s = loader(session_id)
+        with _READ_CACHE_LOCK:
+            _READ_CACHE[session_id] = (time.monotonic() + ttl, s)
+            while len(_READ_CACHE) > _READ_CACHE_MAX:
+                # dicts keep insertion order: drop the oldest entry
+                _READ_CACHE.pop(next(iter(_READ_CACHE)), None)
+        return s
+
+
+def invalidate_cached_session(session_id: str = None) -> None:
+    """Drop one cached session (or all when session_id is None)."""
+    with _READ_CACHE_LOCK:
+        if session_id is None:
+            _READ_CACHE.clear()
+        else:
+            _READ_CACHE.pop(session_id, None)
+
+
+def save_session(session: SessionState, pipe=None) -> None:
+    """
+    Persist the session. When `pipe` (a Redis pipeline) is given, the write is only
+    staged on it so callers can batch it with related writes in one round-trip.
+    """
+    invalidate_cached_session(session.sessionId)
+    r = pipe if pipe is not None else get_redis()
     session.lastUpdatedAtEpoch = int(time.time())
 
     # ✅ keep legacy field synced for older readers/tools
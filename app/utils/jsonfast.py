@@ -0,0 +1,28 @@
+"""
+Fast JSON helpers
+-----------------
+Uses orjson (C-implemented, emits bytes) when installed; falls back to stdlib json
+so the service still runs where orjson is unavailable. Output is always UTF-8 bytes.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+HAS_ORJSON = orjson is not None
+
+
+def dumps(obj, sort_keys: bool = False) -> bytes:
+    """Compact JSON as UTF-8 bytes (Redis and httpx accept bytes directly)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), sort_keys=sort_keys).encode("utf-8")
+
+
+def loads(raw):
+    """Parse JSON from str/bytes."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
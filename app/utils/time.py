@@ -34,6 +34,16 @@ def parse_timestamp_ms(ts) -> int:
         pass
     return now_ms()
 
+def _first_ts(items, sender: str = None):
+    """First positive timestamp in `items` (optionally only from `sender`), else None."""
+    for item in items:
+        if sender is not None and (item.get("sender") or "").lower() != sender:
+            continue
+        ts = parse_timestamp_ms(item.get("timestamp"))
+        if ts > 0:
+            return ts
+    return None
+
 def compute_engagement_seconds(conversation: list[dict], first_seen_ms: int = 0, last_seen_ms: int = 0) -> int:
     """
     Compute engagement window from the first 'scammer' message timestamp
@@ -58,23 +68,13 @@ def compute_engagement_seconds(conversation: list[dict], first_seen_ms: int = 0,
 
     if not conversation:
         return 0
-    # Defensive extraction
-    scammer_ts = None
-    last_agent_ts = None
-    last_any_ts = None
-    for item in conversation:
-        ts = parse_timestamp_ms(item.get("timestamp"))
-        sender = (item.get("sender") or "").lower()
-        if sender == "scammer" and scammer_ts is None and ts > 0:
-            scammer_ts = ts
-        if sender == "agent" and ts > 0:
-            # keep walking; we want the last agent timestamp
-            last_agent_ts = ts
-        if ts > 0:
-            last_any_ts = ts
+    # Only the endpoints matter: scan forward for the first scammer message and backward
+    # for the last agent (else last any) message, parsing only the timestamps visited,
+    # instead of parsing every message of a long transcript.
+    scammer_ts = _first_ts(conversation, "scammer")
     if scammer_ts is None:
         return 0
-    end_ts = last_agent_ts or last_any_ts or scammer_ts
+    end_ts = _first_ts(reversed(conversation), "agent") or _first_ts(reversed(conversation)) or scammer_ts
     duration_ms = max(0, end_ts - scammer_ts)
     sec = duration_ms // 1000
     # If we have messages but timestamps collapse to same ms, ensure minimal non-zero engagement.
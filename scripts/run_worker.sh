@@ -3,4 +3,7 @@ set -e
 # Uses REDIS_URL and RQ_QUEUE_NAME from .env if exported; otherwise defaults.
 REDIS_URL=${REDIS_URL:-redis://localhost:6379/0}
 RQ_QUEUE_NAME=${RQ_QUEUE_NAME:-callback}
-rq worker "$RQ_QUEUE_NAME" --url "$REDIS_URL"
+CALLBACK_RETRY_QUEUE=${CALLBACK_RETRY_QUEUE:-callbacks-retry}
+# --with-scheduler: callback retries are scheduled with enqueue_in (see app/queue/jobs.py)
+# Queue order is priority order: first attempts before retries.
+rq worker "$RQ_QUEUE_NAME" "$CALLBACK_RETRY_QUEUE" --url "$REDIS_URL" --with-scheduler
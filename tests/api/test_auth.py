@@ -0,0 +1,39 @@
+import pytest
+from unittest.mock import patch
+from fastapi import HTTPException
+from app.api.auth import require_api_key, require_admin
+from app.settings import settings
+
+def test_require_api_key_optional_and_enforced():
+    with patch.object(settings, "API_KEY", ""):
+        require_api_key("")  # no key configured -> open
+    with patch.object(settings, "API_KEY", "k1"):
+        require_api_key("k1")
+        with pytest.raises(HTTPException) as exc:
+            require_api_key("nope")
+        assert exc.value.status_code == 401
+
+def test_require_admin_constant_time_and_rotation():
+    with patch.object(settings, "ADMIN_RBAC_ENABLED", True):
+        with patch.object(settings, "ADMIN_API_KEY", "old"):
+            require_admin("old")
+        # A rotated key takes effect on the next request
+        with patch.object(settings, "ADMIN_API_KEY", "new"):
+            with pytest.raises(HTTPException):
+                require_admin("old")
+            require_admin("new")
+        with patch.object(settings, "ADMIN_API_KEY", "ключ"):
+            # Non-ASCII keys are compared as bytes (compare_digest rejects non-ASCII str)
+            require_admin("ключ")
+
+def test_keys_compared_with_compare_digest_on_every_call():
+    import hmac
+    with patch.object(settings, "API_KEY", "k1"), \
+         patch("app.api.auth.compare_digest", wraps=hmac.compare_digest) as spy:
+        require_api_key("k1")
+        require_api_key("k1")
+        with pytest.raises(HTTPException):
+            require_api_key("")
+    # No memo in front of the constant-time comparison
+    assert spy.call_count == 3
+    assert spy.call_args_list[0].args == (b"k1", b"k1")
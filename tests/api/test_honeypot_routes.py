@@ -0,0 +1,50 @@
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from app.main import app
+
+from app.api.auth import require_api_key
+
+client = TestClient(app)
+
+PING_BODY = {
+    "status": "success",
+    "reply": "Honeypot API is running. Send a POST request with {sessionId, message, conversationHistory, metadata}.",
+}
+
+@pytest.fixture(autouse=True)
+def skip_auth():
+    app.dependency_overrides[require_api_key] = lambda: None
+    yield
+    app.dependency_overrides = {}
+
+@pytest.mark.parametrize("path", ["/api/honeypot", "/honeypot", "/detect", "/api/detect", "/ping"])
+def test_get_ping_is_stable(path):
+    response = client.get(path)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/json")
+    assert response.json() == PING_BODY
+
+def test_alias_paths_share_single_route():
+    from app.api.routes import router, CANONICAL_PATH
+    paths = [getattr(r, "path", None) for r in router.routes]
+    assert paths.count(CANONICAL_PATH) == 2  # one POST + one GET
+    for alias in ("/honeypot", "/detect", "/api/detect"):
+        assert alias not in paths
+
+@pytest.mark.parametrize("path", ["/api/honeypot", "/honeypot", "/detect", "/api/detect", "/"])
+def test_post_alias_paths_reach_handler(path):
+    body = {"sessionId": "s1", "message": {"sender": "scammer", "text": "hello", "timestamp": 1}}
+    with patch("app.api.routes.handle_event", return_value={"reply": "hi there"}) as mock_handle:
+        response = client.post(path, json=body)
+    assert response.status_code == 200
+    assert response.json() == {"status": "success", "reply": "hi there"}
+    assert mock_handle.call_args.args[0].sessionId == "s1"
+
+def test_success_body_matches_model_serialization():
+    import json
+    from app.api.routes import _success_body
+    from app.api.schemas import HoneypotResponse
+    for reply in ["plain", 'quote " and \\ backslash', "unicode ₹ “curly”", ""]:
+        body = _success_body(reply)
+        assert json.loads(body) == HoneypotResponse(status="success", reply=reply).model_dump()
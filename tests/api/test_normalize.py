@@ -0,0 +1,37 @@
+from app.api.normalize import normalize_honeypot_payload
+
+def test_normalize_canonical_fast_path():
+    payload = {
+        "sessionId": "s1",
+        "message": {"sender": "scammer", "text": "pay now", "timestamp": 123},
+        "conversationHistory": [{"sender": "user", "text": "hi", "timestamp": 100}],
+        "metadata": {"channel": "SMS"},
+        "detection": {"ignored": True},
+    }
+    out = normalize_honeypot_payload(payload)
+    assert out == {
+        "sessionId": "s1",
+        "message": {"sender": "scammer", "text": "pay now", "timestamp": 123},
+        "conversationHistory": [{"sender": "user", "text": "hi", "timestamp": 100}],
+        "metadata": {"channel": "SMS"},
+    }
+
+def test_normalize_canonical_backfills_timestamp_and_defaults():
+    out = normalize_honeypot_payload({"sessionId": "s1", "message": {"sender": "user", "text": "x"}, "history": [1]})
+    assert isinstance(out["message"]["timestamp"], int) and out["message"]["timestamp"] > 0
+    assert out["conversationHistory"] == [1]
+    assert out["metadata"] == {}
+
+def test_normalize_variant_shapes():
+    out = normalize_honeypot_payload({"session_id": "s2", "message": "hello"})
+    assert out["sessionId"] == "s2"
+    assert out["message"]["sender"] == "scammer"
+    assert out["message"]["text"] == "hello"
+
+    out = normalize_honeypot_payload({"text": "top-level"})
+    assert out["sessionId"] == "tester-session"
+    assert out["message"]["text"] == "top-level"
+
+    out = normalize_honeypot_payload({"sessionId": "s3", "message": {"message": "alt-key"}})
+    assert out["message"]["sender"] == "scammer"
+    assert out["message"]["text"] == "alt-key"
@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 from app.callback.outbox import process_outbox_entry
 from app.store.models import SessionState
 
@@ -37,7 +37,7 @@ def test_process_outbox_entry_success(mock_redis, mock_metrics, mock_client, moc
     
     mock_metrics.increment_callback_attempt.assert_called_once()
     mock_metrics.increment_callback_delivered.assert_called_once()
-    mock_repo.save_session.assert_called_with(session)
+    mock_repo.save_session.assert_called_with(session, pipe=ANY)
 
 @patch("app.callback.outbox.settings")
 @patch("app.callback.outbox.session_repo")
@@ -66,3 +66,303 @@ def test_process_outbox_entry_retry(mock_metrics, mock_client, mock_repo, mock_s
     
     mock_metrics.increment_callback_attempt.assert_called_once()
     mock_metrics.record_failed_callback.assert_called_once()
+
+@patch("app.callback.client.settings")
+@patch("app.callback.client._CLIENT")
+def test_send_final_result_http_reuses_pooled_client(mock_client, mock_settings):
+    from app.callback.client import send_final_result_http
+    mock_settings.GUVI_CALLBACK_URL = "http://example.com/callback"
+    resp = MagicMock()
+    resp.status_code = 202
+    mock_client.post.return_value = resp
+
+    assert send_final_result_http({"a": 1}, {}, timeout=2.0) == (True, 202, None)
+    assert send_final_result_http({"a": 1}, {}, timeout=2.0) == (True, 202, None)
+    assert mock_client.post.call_count == 2
+    assert mock_client.post.call_args.kwargs["timeout"] == 2.0
+
+@patch("app.callback.client._CLIENT", None)
+def test_pooled_client_created_lazily_once():
+    import httpx
+    from app.callback.client import _get_client
+    client = _get_client()
+    try:
+        assert isinstance(client, httpx.Client)
+        assert _get_client() is client
+    finally:
+        client.close()
+
+@patch("app.callback.client.settings")
+@patch("app.callback.client._CLIENT")
+def test_send_final_result_http_bounds_error_excerpt(mock_client, mock_settings):
+    from app.callback.client import send_final_result_http
+    mock_settings.GUVI_CALLBACK_URL = "http://example.com/callback"
+    resp = MagicMock()
+    resp.status_code = 502
+    resp.content = b"x" * 100_000
+    mock_client.post.return_value = resp
+
+    ok, code, err = send_final_result_http({"a": 1}, {}, timeout=2.0)
+    assert (ok, code) == (False, 502)
+    assert err == "HTTP 502: " + "x" * 512
+
+def test_sanitize_and_serialize_single_pass():
+    import json
+    from app.callback.payloads import sanitize_and_serialize
+    raw = {"sessionId": "s1", "scamDetected": "yes", "extractedIntelligence": {"upiIds": "a@upi"}}
+
+    payload, body = sanitize_and_serialize(raw)
+    assert json.loads(body) == payload
+    assert payload["scamDetected"] is True
+    assert payload["extractedIntelligence"]["upiIds"] == ["a@upi"]
+    fp = payload["extractedIntelligence"]["_meta"]["payloadFingerprint"]
+    assert fp.startswith("blake2b:")
+    # Re-running on its own output is stable (old fingerprint is not hashed in)
+    assert sanitize_and_serialize(payload)[1] == body
+
+def test_sanitize_and_serialize_body_is_stamped_canonical():
+    import json
+    import hashlib
+    from app.callback.payloads import sanitize_and_serialize
+    raw = {"sessionId": "s2", "scamDetected": True, "agentNotes": 'note "_meta":{ x',
+           "extractedIntelligence": {"_meta": {"payloadVersion": "1"}, "phoneNumbers": ["1"]}}
+
+    payload, body = sanitize_and_serialize(raw)
+    assert json.loads(body) == payload
+    unstamped = json.loads(body)
+    fp = unstamped["extractedIntelligence"]["_meta"].pop("payloadFingerprint")
+    canonical = json.dumps(unstamped, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    assert fp == "blake2b:" + hashlib.blake2b(canonical.encode("utf-8"), digest_size=32).hexdigest()
+
+@patch("app.callback.payloads.settings")
+def test_sanitize_and_serialize_sha256_opt_in(mock_settings):
+    from app.callback.payloads import sanitize_and_serialize
+    mock_settings.PAYLOAD_FINGERPRINT_ALGO = "sha256"
+    payload, _ = sanitize_and_serialize({"sessionId": "s3"})
+    assert payload["extractedIntelligence"]["_meta"]["payloadFingerprint"].startswith("sha256:")
+
+@patch("app.callback.payloads.settings")
+def test_sanitize_and_serialize_non_default_fingerprint_algo(mock_settings):
+    from app.callback.payloads import sanitize_and_serialize
+    mock_settings.PAYLOAD_FINGERPRINT_ALGO = "BLAKE2b"
+    payload, _ = sanitize_and_serialize({"sessionId": "s3"})
+    assert payload["extractedIntelligence"]["_meta"]["payloadFingerprint"].startswith("blake2b:")
+
+@patch("app.callback.outbox.settings")
+@patch("app.callback.outbox.session_repo")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+def test_process_outbox_entry_reuses_prebuilt_body(mock_redis, mock_metrics, mock_client, mock_repo, mock_settings):
+    mock_settings.ENABLE_OUTBOX = True
+    mock_settings.CALLBACK_MAX_ATTEMPTS = 3
+    mock_settings.CALLBACK_TIMEOUT_SEC = 5.0
+
+    session = SessionState(sessionId="test_sess")
+    session.finalReport = {"some": "data"}
+    mock_repo.load_session.return_value = session
+    mock_client.send_final_result_http.return_value = (True, 200, None)
+
+    assert process_outbox_entry("test_sess", body=b'{"some":"data"}') is True
+    assert mock_client.send_final_result_http.call_args.args[0] == b'{"some":"data"}'
+
+@patch("app.callback.outbox.settings")
+@patch("app.callback.outbox.session_repo")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+def test_process_outbox_entry_dlq_atomic_pipeline(mock_redis, mock_metrics, mock_client, mock_repo, mock_settings):
+    mock_settings.ENABLE_OUTBOX = True
+    mock_settings.CALLBACK_MAX_ATTEMPTS = 3
+
+    session = SessionState(sessionId="test_sess")
+    session.finalReport = {"some": "data"}
+    session.outboxEntry = {"attempts": 3, "status": "pending", "nextAttemptAt": 0}
+    mock_repo.load_session.return_value = session
+    pipe = mock_redis.return_value.pipeline.return_value
+
+    assert process_outbox_entry("test_sess") is True
+    assert session.outboxEntry["status"] == "failed:dlq"
+    mock_repo.save_session.assert_called_once_with(session, pipe=pipe)
+    assert pipe.lpush.call_args.args[0] == "callback:dlq"
+    import json
+    entry = json.loads(pipe.lpush.call_args.args[1])  # collector reads the DLQ as JSON
+    assert entry["sessionId"] == "test_sess" and entry["finalReport"] == {"some": "data"}
+    pipe.execute.assert_called_once()
+    mock_redis.return_value.pipeline.assert_called_with(transaction=True)
+    mock_client.send_final_result_http.assert_not_called()
+
+@patch("app.callback.outbox.settings")
+@patch("app.callback.outbox.session_repo")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+def test_process_outbox_entry_skips_when_lease_held(mock_redis, mock_metrics, mock_client, mock_repo, mock_settings):
+    mock_settings.ENABLE_OUTBOX = True
+    mock_settings.CALLBACK_TIMEOUT_SEC = 5
+    mock_redis.return_value.set.return_value = None  # SET NX lost the race
+
+    assert process_outbox_entry("test_sess") is False
+    mock_repo.load_session.assert_not_called()
+    mock_client.send_final_result_http.assert_not_called()
+    assert mock_redis.return_value.set.call_args.kwargs == {"nx": True, "ex": 10}
+
+@patch("app.callback.outbox.settings")
+@patch("app.callback.outbox.session_repo")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+def test_process_outbox_entry_releases_lease_with_token(mock_redis, mock_metrics, mock_client, mock_repo, mock_settings):
+    mock_settings.ENABLE_OUTBOX = True
+    mock_settings.CALLBACK_TIMEOUT_SEC = 5
+    session = SessionState(sessionId="test_sess")
+    session.finalReport = {"some": "data"}
+    mock_repo.load_session.return_value = session
+    mock_client.send_final_result_http.return_value = (True, 200, None)
+    r = mock_redis.return_value
+
+    assert process_outbox_entry("test_sess") is True
+    key, token = r.set.call_args.args
+    assert key == "outbox:lease:test_sess"
+    assert r.eval.call_args.args[1:] == (1, key, token)
+
+@patch("app.callback.outbox.settings")
+@patch("app.callback.outbox.session_repo")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+def test_process_outbox_entry_dedups_by_fingerprint(mock_redis, mock_metrics, mock_client, mock_repo, mock_settings):
+    mock_settings.ENABLE_OUTBOX = True
+    mock_settings.CALLBACK_MAX_ATTEMPTS = 3
+    mock_settings.CALLBACK_TIMEOUT_SEC = 5
+    r = mock_redis.return_value
+    session = SessionState(sessionId="test_sess")
+    session.finalReport = {"some": "data"}
+    session.finalReportFingerprint = "sha256:abc"
+    mock_repo.load_session.return_value = session
+
+    # 1) Not yet acknowledged: send, then remember the fingerprint on 2xx
+    r.exists.return_value = 0
+    mock_client.send_final_result_http.return_value = (True, 200, None)
+    assert process_outbox_entry("test_sess") is True
+    r.pipeline.return_value.set.assert_called_with("cb:sent:sha256:abc", "1", ex=3600)
+
+    # 2) Same body already acknowledged elsewhere: no POST, ledger marked delivered
+    mock_client.send_final_result_http.reset_mock()
+    session.outboxEntry = None
+    session.callbackStatus = "queued"
+    r.exists.return_value = 1
+    assert process_outbox_entry("test_sess") is True
+    mock_client.send_final_result_http.assert_not_called()
+    assert session.outboxEntry["status"] == "delivered"
+    assert session.callbackStatus == "sent"
+
+def test_build_final_payload_bytes_cached_until_session_changes():
+    from app.callback import payloads
+    session = SessionState(sessionId="cache_sess", scamDetected=True)
+    session.extractedIntelligence.upiIds = ["a@upi"]
+
+    with patch("app.callback.payloads.sanitize_and_serialize", wraps=payloads.sanitize_and_serialize) as spy:
+        p1, b1 = payloads.build_final_payload_bytes(session)
+        p2, b2 = payloads.build_final_payload_bytes(session)
+        assert spy.call_count == 1
+        assert b1 == b2 and p1 == p2 and p1 is not p2
+
+        session.extractedIntelligence.upiIds.append("b@upi")
+        p3, _ = payloads.build_final_payload_bytes(session)
+        assert spy.call_count == 2
+        assert p3["extractedIntelligence"]["upiIds"] == ["a@upi", "b@upi"]
+
+        payloads.build_final_payload_bytes(session, use_cache=False)
+        assert spy.call_count == 3
+
+def test_build_final_payload_bytes_mutating_result_leaves_cache_intact():
+    from app.callback import payloads
+    session = SessionState(sessionId="cache_mut_sess", scamDetected=True)
+    session.extractedIntelligence.upiIds = ["a@upi"]
+
+    p1, b1 = payloads.build_final_payload_bytes(session)
+    expected = payloads.jsonfast.loads(payloads.jsonfast.dumps(p1))
+    p1["extractedIntelligence"]["upiIds"].append("evil@upi")
+    p1["extractedIntelligence"]["_meta"]["payloadFingerprint"] = "tampered"
+    p1["extractedIntelligence"]["phoneNumbers"] = ["+911234567890"]
+
+    p2, b2 = payloads.build_final_payload_bytes(session)
+    assert p2 == expected
+    assert b2 == b1
+
+@patch("app.callback.outbox.settings")
+@patch("app.callback.outbox.session_repo")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+def test_process_outbox_batch_pipelines_leases_and_loads(mock_redis, mock_metrics, mock_client, mock_repo, mock_settings):
+    from app.callback.outbox import process_outbox_batch
+    mock_settings.ENABLE_OUTBOX = True
+    mock_settings.CALLBACK_MAX_ATTEMPTS = 3
+    mock_settings.CALLBACK_TIMEOUT_SEC = 5
+    r = mock_redis.return_value
+    r.exists.return_value = 0
+    # Lease pipeline: s1 and s3 acquired, s2 held by another worker
+    r.pipeline.return_value.execute.return_value = [True, None, True]
+
+    s1, s3 = SessionState(sessionId="s1"), SessionState(sessionId="s3")
+    s1.finalReport = s3.finalReport = {"some": "data"}
+    mock_repo.load_sessions_bulk.return_value = [s1, s3]
+    mock_client.send_final_result_http.return_value = (True, 200, None)
+
+    results = process_outbox_batch([("s1", b"{}"), ("s2", None), ("s3", None), ("s1", None)])
+
+    assert results == {"s1": True, "s2": False, "s3": True}
+    mock_repo.load_sessions_bulk.assert_called_once_with(["s1", "s3"])
+    mock_repo.load_session.assert_not_called()
+    assert mock_client.send_final_result_http.call_count == 2
+    assert mock_client.send_final_result_http.call_args_list[0].args[0] == b"{}"
+
+def test_batch_sender_combines_concurrent_submits():
+    import threading
+    from app.callback.batch_sender import BatchSender
+    batches = []
+    backoffs = {}
+
+    def fake_batch(entries, executor=None, backoff_ms=None):
+        batches.append(entries)
+        backoffs.update(backoff_ms or {})
+        return {sid: sid != "bad" for sid, _ in entries}
+
+    with patch("app.callback.batch_sender.process_outbox_batch", side_effect=fake_batch):
+        sender = BatchSender(window_ms=100, max_batch=8)
+        results = {}
+        threads = [threading.Thread(target=lambda s=s: results.__setitem__(s, sender.submit(s, timeout=5, backoff_ms=50 if s == "a" else None)))
+                   for s in ("a", "b", "bad")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert results == {"a": True, "b": True, "bad": False}
+    assert backoffs == {"a": 50}
+    assert sum(len(b) for b in batches) == 3
+    assert len(batches) < 3
+
+def test_build_final_payload_sanitizes_once_without_revalidating():
+    from app.callback import payloads
+    session = SessionState(sessionId="sanitize_once", scamDetected=True)
+    with patch("app.callback.payloads.sanitize_final_payload", wraps=payloads.sanitize_final_payload) as sanitize, \
+         patch("app.callback.payloads.validate_contract") as validate:
+        payload = payloads.build_final_payload(session, use_cache=False)
+    assert sanitize.call_count == 1
+    validate.assert_not_called()
+    # The single sanitize pass already yields a contract-valid payload
+    assert payloads.validate_final_payload(payload) == (True, "ok")
+
+def test_build_final_payload_signals_opt_in():
+    from app.callback.payloads import build_final_payload
+    session = SessionState(sessionId="signals_sess", scamDetected=True)
+    session.extractedIntelligence.suspiciousKeywords = ["urgent", "otp"]
+
+    with patch("app.callback.payloads.settings.INCLUDE_SIGNALS_IN_CALLBACK", False):
+        assert build_final_payload(session)["extractedIntelligence"]["_signals"] == {}
+    with patch("app.callback.payloads.settings.INCLUDE_SIGNALS_IN_CALLBACK", True):
+        signals = build_final_payload(session)["extractedIntelligence"]["_signals"]
+    assert signals == {"suspiciousKeywords": ["urgent", "otp"]}
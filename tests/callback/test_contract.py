@@ -0,0 +1,39 @@
+import math
+import pytest
+from app.callback import contract
+
+SAMPLES = [
+    None, True, False, 0, 1, -7, 2.0, 2.5, 3.5, -0.4, math.nan, math.inf,
+    "", "  ", "true", " Yes ", "0", "12", "12.7", "abc", "1e3",
+    [], [1, " ", "a", None], {"a": 1}, (1, 2), b"1",
+]
+
+
+@pytest.mark.parametrize("v", SAMPLES, ids=repr)
+def test_type_dispatch_matches_generic_converters(v):
+    assert contract._as_bool(v) == contract._as_bool_any(v)
+    assert contract._as_int(v, default=9) == contract._as_int_any(v, default=9)
+    fast, generic = contract._as_float(v, default=1.5), contract._as_float_any(v, default=1.5)
+    assert fast == generic or (math.isnan(fast) and math.isnan(generic))
+    assert contract._as_list(v) == contract._as_list_any(v)
+
+
+def test_subclass_values_use_generic_path():
+    class MyInt(int):
+        pass
+
+    assert contract._as_int(MyInt(4)) == 4
+    assert contract._as_list(MyInt(4)) == ["4"]
+
+
+def test_validate_contract_reports_first_missing_or_mistyped_ei_key():
+    payload = contract.sanitize_final_payload({"sessionId": "s"})
+    assert contract.validate_contract(payload) == (True, "ok")
+
+    del payload["extractedIntelligence"]["caseIds"]
+    del payload["extractedIntelligence"]["upiIds"]
+    assert contract.validate_contract(payload) == (False, "type:ei.upiIds")
+
+    payload = contract.sanitize_final_payload({"sessionId": "s"})
+    payload["extractedIntelligence"]["phishingLinks"] = ("x",)
+    assert contract.validate_contract(payload) == (False, "type:ei.phishingLinks")
@@ -70,7 +70,7 @@ def test_send_final_result_sync_timeout(mock_post, mock_save, mock_load, mock_se
     assert result is False
     assert mock_session.callbackStatus == "failed"
 
-@patch("app.callback.sender.log")
+@patch("app.callback.sender.log_json")
 def test_send_final_result_sync_no_url(mock_log, mock_session):
     # Setup
     settings.GUVI_CALLBACK_URL = ""
@@ -80,4 +80,110 @@ def test_send_final_result_sync_no_url(mock_log, mock_session):
     
     # Verify
     assert result is False
-    mock_log.assert_called_with(event="final_output_sync_skipped_no_url", sessionId="test-session-123")
+    mock_log.assert_called_with("final_output_sync_skipped_no_url", sessionId="test-session-123")
+
+@patch("app.callback.sender.time.sleep")
+@patch("app.callback.sender.load_session_fields")
+@patch("app.callback.sender.process_outbox_entry")
+@patch("app.callback.sender.settings")
+def test_send_final_result_sync_retries_after_ledger_backoff(mock_settings, mock_process, mock_fields, mock_sleep):
+    import time
+    mock_settings.GUVI_CALLBACK_URL = "http://example.com/callback"
+    mock_settings.CALLBACK_BATCH_WINDOW_MS = 0
+    mock_settings.CALLBACK_TIMEOUT_SEC = 1
+    mock_process.side_effect = [False, True]
+    mock_fields.return_value = {"outboxEntry": {"status": "pending", "nextAttemptAt": int(time.time() * 1000) + 200}}
+
+    assert send_final_result_sync("s1", deadline_sec=5.0, max_retries=1) is True
+    assert mock_process.call_count == 2
+    assert 0 < mock_sleep.call_args.args[0] <= 0.2
+    # The first attempt books the short sync backoff; the last one leaves RQ's in place
+    assert [c.kwargs["backoff_ms"] for c in mock_process.call_args_list] == [50, None]
+
+@patch("app.callback.sender.time.sleep")
+@patch("app.callback.sender.load_session_fields")
+@patch("app.callback.sender.process_outbox_entry")
+@patch("app.callback.sender.settings")
+def test_send_final_result_sync_leaves_retry_to_rq_when_over_budget(mock_settings, mock_process, mock_fields, mock_sleep):
+    import time
+    mock_settings.GUVI_CALLBACK_URL = "http://example.com/callback"
+    mock_settings.CALLBACK_BATCH_WINDOW_MS = 0
+    mock_settings.CALLBACK_TIMEOUT_SEC = 5
+    mock_process.return_value = False
+    mock_fields.return_value = {"outboxEntry": {"status": "pending", "nextAttemptAt": int(time.time() * 1000) + 1000}}
+
+    assert send_final_result_sync("s1", deadline_sec=2.0, max_retries=3) is False
+    assert mock_process.call_count == 1
+    mock_sleep.assert_not_called()
+
+@patch("app.callback.sender.time.sleep")
+@patch("app.callback.sender.load_session_fields")
+@patch("app.callback.sender.process_outbox_entry")
+@patch("app.callback.sender.settings")
+def test_send_final_result_sync_leaves_long_backoff_to_rq_within_budget(mock_settings, mock_process, mock_fields, mock_sleep):
+    from app.utils.time import now_ms
+    mock_settings.GUVI_CALLBACK_URL = "http://example.com/callback"
+    mock_settings.CALLBACK_BATCH_WINDOW_MS = 0
+    mock_settings.CALLBACK_TIMEOUT_SEC = 1
+    mock_process.return_value = False
+    # Fits the 8 s deadline, but a 1 s backoff is longer than an inline retry may wait
+    mock_fields.return_value = {"outboxEntry": {"status": "pending", "nextAttemptAt": now_ms() + 1000}}
+
+    assert send_final_result_sync("s1", deadline_sec=8.0, max_retries=1) is False
+    assert mock_process.call_count == 1
+    mock_sleep.assert_not_called()
+
+@patch("app.callback.sender.time.sleep")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.session_repo")
+def test_send_final_result_sync_retries_inline_through_real_ledger_backoff(mock_repo, mock_client, mock_redis, mock_metrics, mock_sleep, monkeypatch):
+    from app.callback import outbox
+    monkeypatch.setattr(settings, "GUVI_CALLBACK_URL", "http://example.com/callback")
+    monkeypatch.setattr(settings, "ENABLE_OUTBOX", True)
+    monkeypatch.setattr(settings, "CALLBACK_BATCH_WINDOW_MS", 0)
+    monkeypatch.setattr(settings, "CALLBACK_BASE_DELAY_MS", 1000)
+    session = SessionState(sessionId="s1", finalReport={"some": "data"})
+    mock_repo.load_session.return_value = session
+    mock_client.send_final_result_http.side_effect = [(False, 503, "busy"), (False, 503, "busy"), (True, 200, None)]
+    mock_redis.return_value.exists.return_value = 0
+
+    # Both the backoff booking and the wait read the real ledger written by _record_attempt;
+    # sleeping advances the outbox clock so the booked nextAttemptAt is reached
+    clock = {"ms": outbox._now_ms()}
+    monkeypatch.setattr(outbox, "_now_ms", lambda: clock["ms"])
+    monkeypatch.setattr("app.callback.sender.now_ms", lambda: clock["ms"])
+    mock_sleep.side_effect = lambda sec: clock.__setitem__("ms", clock["ms"] + int(sec * 1000) + 1)
+    with patch("app.callback.sender.load_session_fields", side_effect=lambda sid, fields: {"outboxEntry": session.outboxEntry}), \
+         patch("app.callback.outbox._calc_backoff", wraps=outbox._calc_backoff) as spy_backoff:
+        assert send_final_result_sync("s1", deadline_sec=8.0, max_retries=2) is True
+
+    assert mock_client.send_final_result_http.call_count == 3
+    assert [round(c.args[0], 2) for c in mock_sleep.call_args_list] == [0.05, 0.15]
+    # Inline retries book the short sync backoff instead of the ~1 s exponential one
+    spy_backoff.assert_not_called()
+    assert session.outboxEntry["status"] == "delivered"
+
+@patch("app.callback.sender.time.sleep")
+@patch("app.callback.outbox.metrics")
+@patch("app.callback.outbox.get_redis")
+@patch("app.callback.outbox.callback_client")
+@patch("app.callback.outbox.session_repo")
+def test_send_final_result_sync_last_attempt_books_rq_backoff(mock_repo, mock_client, mock_redis, mock_metrics, mock_sleep, monkeypatch):
+    from app.callback import outbox
+    monkeypatch.setattr(settings, "GUVI_CALLBACK_URL", "http://example.com/callback")
+    monkeypatch.setattr(settings, "ENABLE_OUTBOX", True)
+    monkeypatch.setattr(settings, "CALLBACK_BATCH_WINDOW_MS", 0)
+    monkeypatch.setattr(settings, "CALLBACK_BASE_DELAY_MS", 1000)
+    session = SessionState(sessionId="s1", finalReport={"some": "data"})
+    mock_repo.load_session.return_value = session
+    mock_client.send_final_result_http.return_value = (False, 503, "busy")
+    mock_redis.return_value.exists.return_value = 0
+
+    assert send_final_result_sync("s1", deadline_sec=8.0, max_retries=0) is False
+
+    mock_sleep.assert_not_called()
+    # Real _calc_backoff(1): CALLBACK_BASE_DELAY_MS ±10%, left for the RQ fallback
+    history = session.outboxEntry["history"]
+    assert 900 <= session.outboxEntry["nextAttemptAt"] - history[0]["ts"] <= 1100 + history[0]["duration"]
@@ -80,3 +80,12 @@ def test_unknown_scam_type():
     target = choose_ladder_target({}, "UNKNOWN", {}, 10)
     assert target is None
 
+
+def test_normalize_scam_type_is_memoized():
+    from app.core.investigative_ladder import normalize_scam_type
+    normalize_scam_type.cache_clear()
+    assert normalize_scam_type("upi_fraud") == "UPI_FRAUD"
+    assert normalize_scam_type(" Fake Bank KYC ") == "BANK_IMPERSONATION"
+    assert normalize_scam_type(None) == "UNKNOWN"
+    assert normalize_scam_type("upi_fraud") == "UPI_FRAUD"
+    assert normalize_scam_type.cache_info().hits == 1
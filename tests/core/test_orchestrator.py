@@ -231,3 +231,37 @@ def test_handle_event_detector_persistence(
     assert session.confidence == 0.85
     assert session.scamType == "BANK_IMPERSONATION"
     assert session.scam_type == "BANK_IMPERSONATION"
+
+@patch("app.core.orchestrator.session_lock", MagicMock())
+@patch("app.core.orchestrator.load_session_fields")
+@patch("app.core.orchestrator.enqueue_guvi_final_result")
+@patch("app.core.orchestrator.metrics")
+@patch("app.core.orchestrator.get_redis")
+@patch("app.core.orchestrator.load_session")
+@patch("app.core.orchestrator.save_session")
+@patch("app.core.orchestrator.detect_scam")
+@patch("app.core.orchestrator.choose_next_action")
+@patch("app.core.orchestrator.generate_agent_reply")
+@patch("app.core.orchestrator.should_finalize")
+@patch("app.core.orchestrator.log")
+def test_finalization_serializes_report_once(
+    mock_log, mock_finalize, mock_reply, mock_choose, mock_detect, mock_save, mock_load,
+    mock_redis, mock_metrics, mock_enqueue, mock_fields, mock_req
+):
+    import json
+    session = SessionState(sessionId="test_session")
+    mock_load.return_value = session
+    mock_detect.return_value = {"scamDetected": True, "confidence": 0.9, "scamType": "UPI_FRAUD"}
+    mock_choose.return_value = {"intent": "INT_ACK_CONCERN", "bf_state": "BF_S1", "force_finalize": True}
+    mock_reply.return_value = "Okay"
+    mock_finalize.return_value = None
+    mock_fields.return_value = {"outboxEntry": None}
+
+    with patch("app.core.orchestrator.settings.STORE_LAST_CALLBACK_PAYLOAD", True):
+        handle_event(mock_req)
+
+    body = mock_enqueue.call_args.kwargs["payload_bytes"]
+    assert json.loads(body) == session.finalReport
+    # The debug copy in Redis is the same bytes object handed to the inline send
+    stored = mock_redis.return_value.pipeline.return_value.set.call_args.args[1]
+    assert stored is body
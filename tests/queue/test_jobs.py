@@ -4,6 +4,7 @@ from app.core.guvi_callback import enqueue_guvi_final_result
 from app.callback.payloads import build_final_payload
 from app.queue.jobs import send_final_callback_job
 from app.store.models import SessionState
+from app.settings import settings
 
 def test_build_payload():
     session = SessionState(sessionId="test_session", turnIndex=5, scamDetected=True)
@@ -35,3 +36,79 @@ def test_send_final_callback_job(mock_send, mock_log):
     mock_send.assert_called_with("test_session")
     mock_log.assert_called_once()
     assert mock_log.call_args.kwargs["event"] == "callback_job_start"
+
+@patch("app.queue.jobs.log")
+@patch("app.queue.jobs.get_queue")
+@patch("app.queue.jobs.load_session_fields")
+@patch("app.queue.jobs.process_outbox_entry", return_value=False)
+def test_send_final_callback_job_schedules_retry(mock_process, mock_fields, mock_get_queue, mock_log):
+    from app.utils.time import now_ms
+    mock_fields.return_value = {"outboxEntry": {"status": "pending", "attempts": 2, "nextAttemptAt": now_ms() + 60_000}}
+    q = MagicMock()
+    q.connection.hget.return_value = None
+    mock_get_queue.return_value = q
+
+    send_final_callback_job("sess:1")
+
+    q.enqueue.assert_not_called()
+    delta, func, sid = q.enqueue_in.call_args.args
+    assert 50 < delta.total_seconds() <= 60
+    assert sid == "sess:1"
+    assert q.enqueue_in.call_args.kwargs["job_id"] == "cb-sess_1-2"
+    assert mock_get_queue.call_args.kwargs["name"] == settings.CALLBACK_RETRY_QUEUE
+
+@pytest.mark.parametrize("status,enqueued", [(b"queued", False), (b"scheduled", False), (b"finished", True), (None, True)])
+@patch("app.queue.jobs.log")
+@patch("app.queue.jobs.get_queue")
+@patch("app.queue.jobs.load_session_fields")
+def test_schedule_callback_retry_skips_live_job_id(mock_fields, mock_get_queue, mock_log, status, enqueued):
+    from app.queue.jobs import schedule_callback_retry
+    from app.utils.time import now_ms
+    mock_fields.return_value = {"outboxEntry": {"status": "pending", "attempts": 3, "nextAttemptAt": now_ms() - 5}}
+    q = MagicMock()
+    q.count = 100
+    q.connection.hget.return_value = status
+    mock_get_queue.return_value = q
+
+    with patch("app.queue.jobs.lease_remaining_ms", return_value=0):
+        assert schedule_callback_retry("sess1") == 0
+
+    q.connection.hget.assert_called_once_with("rq:job:cb-sess1-3", "status")
+    assert q.enqueue.called is enqueued
+    q.enqueue_in.assert_not_called()
+
+@patch("app.queue.jobs.log")
+@patch("app.queue.jobs.get_queue")
+@patch("app.queue.jobs.load_session_fields")
+@patch("app.queue.jobs.process_outbox_entry", return_value=True)
+def test_send_final_callback_job_no_retry_when_done(mock_process, mock_fields, mock_get_queue, mock_log):
+    send_final_callback_job("sess1")
+    mock_fields.assert_not_called()
+    mock_get_queue.assert_not_called()
+
+def test_pick_dispatch_mode():
+    from app.queue.jobs import pick_dispatch_mode
+    assert pick_dispatch_mode(0, 100) == "rq_immediate"
+    assert pick_dispatch_mode(settings.CALLBACK_MIN_RESCHEDULE_MS, 100) == "rq_immediate"
+    assert pick_dispatch_mode(settings.CALLBACK_MAX_INLINE_MS, 0) == "inline_short_sleep"
+    assert pick_dispatch_mode(settings.CALLBACK_MAX_INLINE_MS, 100) == "rq_scheduler"
+    assert pick_dispatch_mode(settings.CALLBACK_MAX_INLINE_MS + 1, 0) == "rq_scheduler"
+
+@patch("app.queue.jobs.time.sleep")
+@patch("app.queue.jobs.log")
+@patch("app.queue.jobs.get_queue")
+@patch("app.queue.jobs.load_session_fields")
+@patch("app.queue.jobs.process_outbox_entry", side_effect=[False, True])
+def test_send_final_callback_job_waits_inline_for_near_retry(mock_process, mock_fields, mock_get_queue, mock_log, mock_sleep):
+    from app.utils.time import now_ms
+    mock_fields.return_value = {"outboxEntry": {"status": "pending", "attempts": 1, "nextAttemptAt": now_ms() + 300}}
+    q = MagicMock()
+    q.count = 0
+    mock_get_queue.return_value = q
+
+    send_final_callback_job("sess1")
+
+    assert mock_process.call_count == 2
+    assert 0 < mock_sleep.call_args.args[0] <= 0.3
+    q.enqueue.assert_not_called()
+    q.enqueue_in.assert_not_called()
@@ -121,3 +121,89 @@ def test_migrate_session_data_logging(mock_log):
     assert kwargs["droppedLegacyScamType"] is True
     assert kwargs["removedTopFields"] == 1
     assert kwargs["removedIntelFields"] == 1
+
+@patch("app.store.session_repo.get_redis")
+def test_load_sessions_bulk_single_round_trip(mock_get_redis):
+    from app.store.session_repo import load_sessions_bulk
+    mock_redis = MagicMock()
+    mock_get_redis.return_value = mock_redis
+    pipe = MagicMock()
+    mock_redis.pipeline.return_value = pipe
+    pipe.execute.return_value = [json.dumps({"sessionId": "a", "turnIndex": 3}), None]
+
+    sessions = load_sessions_bulk(["a", "b"])
+
+    mock_redis.pipeline.assert_called_once_with(transaction=False)
+    pipe.execute.assert_called_once()
+    assert [s.sessionId for s in sessions] == ["a", "b"]
+    assert sessions[0].turnIndex == 3
+    assert sessions[1].turnIndex == 0
+    mock_redis.get.assert_not_called()
+
+@patch("app.store.session_repo.get_redis")
+def test_load_session_fields_projection(mock_get_redis):
+    from app.store.session_repo import load_session_fields
+    mock_redis = MagicMock()
+    mock_get_redis.return_value = mock_redis
+    mock_redis.get.return_value = json.dumps({
+        "sessionId": "p1",
+        "outboxEntry": {"status": "pending"},
+        "conversation": [{"text": "big"}],
+    })
+
+    out = load_session_fields("p1", ("callbackStatus", "outboxEntry", "postscript"))
+
+    assert out == {"callbackStatus": "none", "outboxEntry": {"status": "pending"}, "postscript": []}
+    mock_redis.get.assert_called_once_with("session:p1")
+
+@patch("app.store.session_repo.get_redis")
+def test_load_session_cached_single_flight_and_invalidation(mock_get_redis):
+    from app.store.session_repo import load_session_cached, save_session, invalidate_cached_session
+    mock_get_redis.return_value = MagicMock()
+    invalidate_cached_session()
+    loader = MagicMock(side_effect=lambda sid: SessionState(sessionId=sid))
+
+    first = load_session_cached("c1", loader=loader, ttl_sec=30)
+    second = load_session_cached("c1", loader=loader, ttl_sec=30)
+    assert first is second
+    assert loader.call_count == 1
+
+    # Writes invalidate the cached entry in-process
+    save_session(first)
+    load_session_cached("c1", loader=loader, ttl_sec=30)
+    assert loader.call_count == 2
+
+    # ttl <= 0 bypasses the cache entirely
+    load_session_cached("c1", loader=loader, ttl_sec=0)
+    assert loader.call_count == 3
+    invalidate_cached_session()
+
+@patch("app.store.session_repo.get_redis")
+def test_load_session_cached_locks_stay_bounded(mock_get_redis):
+    from app.store import session_repo
+    mock_get_redis.return_value = MagicMock()
+    session_repo.invalidate_cached_session()
+    locks = session_repo._READ_KEY_LOCKS
+
+    def failing_loader(sid):
+        raise RuntimeError("redis down")
+
+    for i in range(500):
+        sid = f"lk{i}"
+        session_repo.save_session(session_repo.load_session_cached(sid, loader=lambda s: SessionState(sessionId=s), ttl_sec=30))
+        with pytest.raises(RuntimeError):
+            session_repo.load_session_cached(f"bad{i}", loader=failing_loader, ttl_sec=30)
+        assert session_repo._read_key_lock(sid) in locks
+
+    # Saves invalidated every entry and failed loads never cached one; the lock pool is fixed
+    assert session_repo._READ_KEY_LOCKS is locks
+    assert len(locks) == session_repo._READ_KEY_LOCK_STRIPES
+    assert not session_repo._READ_CACHE
+    assert not any(lock.locked() for lock in locks)
+
+@patch("app.store.session_repo.log")
+def test_migrate_session_data_current_schema_does_not_log(mock_log):
+    data = {"sessionId": "s", "turnIndex": 3, "scamType": "UPI_FRAUD", "extractedIntelligence": {"upiIds": []}}
+    migrated = _migrate_session_data(data)
+    assert migrated["totalMessagesExchanged"] == 3
+    mock_log.assert_not_called()
@@ -38,6 +38,31 @@ def test_admin_session_snapshot(mock_load, skip_auth):
     assert data["durationSec"] == 60
     assert data["finalizedAt"] == 1234567890
 
+@patch("app.api.admin_routes.load_session")
+def test_admin_session_timeline_merge_and_paginate(mock_load, skip_auth):
+    s = SessionState(sessionId="tl-1")
+    s.conversation = [
+        {"sender": "scammer", "text": "a", "timestamp": 1000},
+        {"sender": "agent", "text": "b", "timestamp": 2000},
+        {"sender": "scammer", "text": "c", "timestamp": 4000},
+    ]
+    s.postscript = [{"sender": "scammer", "text": "late", "timestamp": 6000, "ignored": True}]
+    s.finalizedAt = 5000
+    s.reportId = "tl-1:1"
+    s.agentNotes = "notes | finalize_reason=ioc_milestone | postscript"
+    mock_load.return_value = s
+
+    resp = client.get("/admin/session/tl-1/timeline")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [e["timestamp"] for e in data] == [1000, 2000, 4000, 5000, 6000]
+    assert data[3]["type"] == "lifecycle_finalized"
+    assert data[3]["reason"] == "ioc_milestone"
+    assert data[4]["type"] == "postscript_message" and data[4]["ignored"] is True
+
+    resp = client.get("/admin/session/tl-1/timeline", params={"after_ts": 2000, "limit": 2})
+    assert [e["timestamp"] for e in resp.json()] == [4000, 5000]
+
 @patch("app.observability.metrics.get_redis")
 def test_slo_metrics(mock_get_redis, skip_auth):
     # Mock Redis responses for SLO
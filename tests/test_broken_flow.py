@@ -164,3 +164,144 @@ def test_guardrail_finalization_ignores_non_registry_data(session, settings):
         # Add 2nd registered category
         session.extractedIntelligence.phishingLinks = ["http://scam.com"]
         assert should_finalize(session) == "evidence_quorum_iocs"
+
+def test_compute_ioc_signature_order_insensitive_and_change_sensitive():
+    a = {"upiIds": ["b@upi", "a@upi"], "phoneNumbers": ["+911"], "unregistered": ["x"]}
+    b = {"phoneNumbers": ["+911"], "upiIds": ["a@upi", "b@upi"]}
+    assert compute_ioc_signature(a) == compute_ioc_signature(b)
+    # Moving a value to another category is a change
+    c = {"upiIds": ["b@upi", "a@upi", "+911"], "phoneNumbers": []}
+    assert compute_ioc_signature(a) != compute_ioc_signature(c)
+    # No values at all is one stable, non-empty signature (empty lists == missing keys)
+    empty = compute_ioc_signature({})
+    assert empty and empty == compute_ioc_signature({"phoneNumbers": [], "upiIds": []})
+    assert empty != compute_ioc_signature(b)
+
+def test_sorted_specs_follow_registry_overrides():
+    from app.intel.artifact_registry import artifact_registry
+    from app.core.broken_flow_controller import _sorted_specs
+    assert _sorted_specs("PHISHING")[0].key == "phishingLinks"
+    assert _sorted_specs("SOMETHING_ELSE") is _sorted_specs("UNKNOWN")
+    # Reused until the registry version moves
+    cached = _sorted_specs("PHISHING")
+    assert isinstance(cached, tuple) and _sorted_specs("PHISHING") is cached
+
+    artifact_registry._apply_overrides({"phoneNumbers": {"priority": 99}})
+    try:
+        assert _sorted_specs("PHISHING")[0].key == "phoneNumbers"
+    finally:
+        artifact_registry._apply_overrides({})
+    assert _sorted_specs("PHISHING")[0].key == "phishingLinks"
+    assert _sorted_specs("PHISHING") is not cached
+
+def test_expected_iocs_and_category_count():
+    from app.core.broken_flow_controller import _expected_iocs_covered, _ioc_category_count_from_dict
+    intel = {"upiIds": ["a@upi"], "phoneNumbers": ["+911"], "caseIds": [], "notAnArtifact": ["x"]}
+    assert _expected_iocs_covered(intel, "upi_fraud") is False
+    intel["caseIds"] = ["REF1234"]
+    assert _expected_iocs_covered(intel, "upi_fraud") is True
+    assert _expected_iocs_covered(intel, "UNKNOWN") is False
+    assert _ioc_category_count_from_dict(intel) == 3
+
+def test_expected_iocs_table_is_frozen_and_upper_keyed():
+    from app.core.broken_flow_controller import EXPECTED_IOCS_BY_SCAMTYPE
+    # _expected_iocs_covered does one .get on the upper-cased scam type and walks a tuple
+    for scam_type, keys in EXPECTED_IOCS_BY_SCAMTYPE.items():
+        assert scam_type == scam_type.upper()
+        assert isinstance(keys, tuple)
+
+def test_pick_missing_intel_target_relaxes_cooldown_in_priority_order():
+    from app.intel.artifact_registry import artifact_registry
+    from app.core.broken_flow_controller import _pick_missing_intel_target
+    top_intent, _ = _pick_missing_intel_target({}, [])
+    # Top pick on cooldown -> next off-cooldown artifact
+    assert _pick_missing_intel_target({}, [top_intent])[0] != top_intent
+
+    # Only phoneNumbers missing and its intent on cooldown -> asked anyway (relaxed)
+    intel = {k: ["x"] for k in artifact_registry.artifacts if k != "phoneNumbers"}
+    assert _pick_missing_intel_target(intel, [INT_ASK_OFFICIAL_HELPLINE] * 3) == (INT_ASK_OFFICIAL_HELPLINE, "phoneNumbers")
+
+def test_pivot_intent_matches_appended_history():
+    from app.core.broken_flow_controller import _pick_missing_intel_target, _pivot_intent
+    histories = [[], [INT_ACK_CONCERN], [INT_ACK_CONCERN, INT_ACK_CONCERN],
+                 [INT_ASK_OFFICIAL_WEBSITE, INT_ASK_ALT_VERIFICATION, INT_ACK_CONCERN]]
+    for recent in histories:
+        for avoid in (INT_ACK_CONCERN, INT_ASK_OFFICIAL_WEBSITE):
+            before = list(recent)
+            assert _pivot_intent({}, recent, avoid) == _pick_missing_intel_target({}, recent + [avoid])
+            assert recent == before
+
+def test_ladder_target_dispatch_and_fallback():
+    from unittest.mock import patch
+    from app.core.broken_flow_controller import _ladder_target, _pick_missing_intel_target
+    s = SessionState(sessionId="ladder")
+    s.scam_type = "UNKNOWN"  # set by choose_next_action's session defaults
+    intel = {"phoneNumbers": [], "phishingLinks": [], "upiIds": [], "bankAccounts": []}
+    with patch("app.core.broken_flow_controller.choose_ladder_target", return_value="emailAddresses"):
+        assert _ladder_target(s, intel, 0) == (INT_ASK_OFFICIAL_WEBSITE, "emailAddresses")
+    assert s.lastLadderTarget == "emailAddresses"
+    with patch("app.core.broken_flow_controller.choose_ladder_target", return_value="department"):
+        assert _ladder_target(s, intel, 0) == (INT_ASK_DEPARTMENT_BRANCH, None)
+    # Ladder keys without a dedicated intent fall back to the missing-intel picker
+    with patch("app.core.broken_flow_controller.choose_ladder_target", return_value="bankAccounts"):
+        assert _ladder_target(s, intel, 0) == _pick_missing_intel_target(intel, s.bf_recent_intents, s.scam_type)
+
+def test_controller_membership_sets_are_frozen():
+    from app.core import broken_flow_controller as bfc
+    assert isinstance(bfc._ALLOWED_INTENTS, frozenset)
+    assert isinstance(bfc._ACK_SET, frozenset)
+    # Boundary terms only seed the compiled alternation (kept ordered for a stable pattern)
+    assert bfc._BOUNDARY_SEARCH("share your Pin") is not None
+    assert bfc._BOUNDARY_SEARCH("call the helpline") is None
+
+def test_break_loop_transitions():
+    from app.core.broken_flow_controller import _break_loop
+    assert _break_loop(BF_S1, 0, 0, 3, 1) == (BF_S2, 0)
+    assert _break_loop(BF_S2, 2, 0, 3, 1) == (BF_S2, 0)
+    assert _break_loop(BF_S2, 3, 0, 3, 1) == (BF_S3, 0)
+    assert _break_loop(BF_S3, 3, 0, 3, 1) == (BF_S4, 1)
+    assert _break_loop(BF_S3, 3, 1, 3, 1) == (BF_S5, 1)
+    assert _break_loop(BF_S4, 5, 1, 3, 1) == (BF_S5, 1)
+    assert _break_loop(BF_S0, 9, 0, 3, 1) == (BF_S0, 0)
+    assert _break_loop(BF_S5, 9, 0, 3, 1) == (BF_S5, 0)
+
+def test_count_intent_in_window():
+    from app.core.broken_flow_controller import _count_intent_in_window
+    recent = [INT_ASK_ALT_VERIFICATION, INT_ACK_CONCERN, INT_ASK_ALT_VERIFICATION, INT_ASK_TICKET_REF]
+    assert _count_intent_in_window(recent, INT_ASK_ALT_VERIFICATION, 0) == 2
+    assert _count_intent_in_window(recent, INT_ASK_ALT_VERIFICATION, 2) == 1
+    assert _count_intent_in_window(recent, INT_ASK_ALT_VERIFICATION, 10) == 2
+    assert _count_intent_in_window([], INT_ACK_CONCERN, 3) == 0
+
+def test_choose_next_action_returns_plain_decision_dict():
+    # decide_termination gates on isinstance(controller_out, dict); the orchestrator uses .get()
+    s = SessionState(sessionId="decision-shape")
+    out = choose_next_action(s, "hello", {"phoneNumbers": []}, {}, None)
+    assert type(out) is dict
+    assert set(out) == {
+        "bf_state", "intent", "responder_key", "reason",
+        "force_finalize", "scam_type", "instruction", "target_key",
+    }
+
+def test_intent_and_instruction_resolution_from_dynamic_map():
+    from unittest.mock import patch
+    from app.intel.artifact_registry import artifact_registry
+    from app.core.broken_flow_controller import _intent_for_key, _instruction_for, INSTRUCTION_TEXTS
+    dyn = {"caseIds": {"intent": INT_ASK_TICKET_REF, "instruction": "ask for the complaint id"},
+           "upiIds": {"intent": None, "instruction": None}}
+    with patch.dict(artifact_registry.intent_map, dyn, clear=True):
+        assert _intent_for_key("caseIds") == INT_ASK_TICKET_REF
+        assert _instruction_for(INT_ASK_TICKET_REF, "caseIds") == "ask for the complaint id"
+        # Empty entries fall back to the static tables
+        assert _intent_for_key("upiIds") == INT_ASK_ALT_VERIFICATION
+        assert _instruction_for(INT_ASK_ALT_VERIFICATION, "upiIds") == INSTRUCTION_TEXTS[INT_ASK_ALT_VERIFICATION]
+        assert _instruction_for(INT_ACK_CONCERN) == INSTRUCTION_TEXTS[INT_ACK_CONCERN]
+
+def test_advance_to_only_moves_forward():
+    from app.core.broken_flow_controller import _advance_to
+    assert _advance_to(BF_S0, BF_S4) == BF_S4
+    assert _advance_to(BF_S3, BF_S4) == BF_S4
+    assert _advance_to(BF_S3, BF_S3) == BF_S3
+    assert _advance_to(BF_S4, BF_S2) == BF_S4
+    assert _advance_to(BF_S5, BF_S4) == BF_S5
+    assert _advance_to("BF_UNKNOWN", BF_S2) == "BF_UNKNOWN"
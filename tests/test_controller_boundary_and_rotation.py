@@ -67,3 +67,80 @@ def test_cooldown_for_alt_verification_repetition():
     )
     # Should pivot away from ALT_VERIFICATION if it was used very recently
     assert out["intent"] != INT_ASK_ALT_VERIFICATION
+
+def test_otp_pressure_count_scans_recent_scammer_messages():
+    from app.core.broken_flow_controller import _otp_pressure_count
+    s = SessionState(sessionId="otp-pressure")
+    s.conversation = [
+        {"sender": "scammer", "text": "share the OTP"},       # outside the window
+        {"sender": "scammer", "text": "what is your PIN?"},
+        {"sender": "user", "text": "my password is safe"},    # not a scammer message
+        {"sender": "Scammer", "text": "send Password now"},
+        {"sender": "scammer", "text": "hurry up"},
+    ]
+    assert _otp_pressure_count(s, 3) == 2
+    assert _otp_pressure_count(s, 10) == 3
+
+def test_boundary_refusal_caps_recent_intents_as_list():
+    session = _new_session()
+    session.bf_recent_intents = [INT_ASK_OFFICIAL_HELPLINE] * 10
+    intel = {"phoneNumbers": [], "upiIds": [], "bankAccounts": [], "phishingLinks": []}
+    out = choose_next_action(
+        session=session,
+        latest_text="Please share OTP now",
+        intel_dict=intel,
+        detection_dict={},
+        settings=None,
+    )
+    assert out["intent"] == INT_REFUSE_SENSITIVE_ONCE
+    # Stays a JSON-serializable list, trimmed from the head
+    assert isinstance(session.bf_recent_intents, list)
+    assert len(session.bf_recent_intents) == 10
+    assert session.bf_recent_intents[-1] == INT_REFUSE_SENSITIVE_ONCE
+
+def test_opening_move_follows_red_flag():
+    from app.core.broken_flow_controller import INT_ASK_OFFICIAL_WEBSITE
+    intel = {"phoneNumbers": [], "upiIds": [], "bankAccounts": [], "phishingLinks": []}
+    for red_flag, expected in (("suspicious_link", INT_ASK_OFFICIAL_WEBSITE), (None, INT_ASK_OFFICIAL_HELPLINE)):
+        session = _new_session()
+        out = choose_next_action(
+            session=session,
+            latest_text="Your account is blocked",
+            intel_dict=intel,
+            detection_dict={},
+            settings=None,
+            red_flag=red_flag,
+        )
+        assert out["intent"] == expected
+
+def test_satisfied_guard_pivots_away_from_answered_category():
+    session = _new_session()
+    intel = {"phoneNumbers": [], "upiIds": [], "bankAccounts": [], "phishingLinks": [], "caseIds": ["REF-1234"]}
+    out = choose_next_action(
+        session=session,
+        latest_text="This is about your complaint",
+        intel_dict=intel,
+        detection_dict={},
+        settings=None,
+        red_flag="THREAT_PRESSURE",  # opening move: ask for the ticket reference
+    )
+    assert out["reason"] == "satisfied_guard_pivot_case"
+    assert out["intent"] != "INT_ASK_TICKET_REF"
+
+def test_latest_text_boundary_scan_runs_once_on_raw_text():
+    from unittest.mock import patch
+    from app.core import broken_flow_controller as bfc
+    seen = []
+    real = bfc._BOUNDARY_SEARCH
+
+    def spy(text):
+        seen.append(text)
+        return real(text)
+
+    session = _new_session()
+    session.bf_policy_refused_once = True  # no early return: the full turn runs
+    intel = {"phoneNumbers": [], "upiIds": [], "bankAccounts": [], "phishingLinks": []}
+    with patch.object(bfc, "_BOUNDARY_SEARCH", spy):
+        choose_next_action(session, "Send the OTP Now", intel, {}, None)
+    # conversation is empty, so the only scan is the latest message, un-lowered
+    assert seen == ["Send the OTP Now"]
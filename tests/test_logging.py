@@ -0,0 +1,23 @@
+import json
+from unittest.mock import patch
+
+from app.observability.logging import log_json
+
+
+def test_log_json_emits_one_json_line(capsys):
+    with patch("app.observability.logging.settings.ENABLE_PII_REDACTION", True):
+        log_json("evt", sessionId="s1", text="secret", n=2)
+    line = capsys.readouterr().out
+    assert line.endswith("\n") and line.count("\n") == 1
+    rec = json.loads(line)
+    assert rec["event"] == "evt" and rec["sessionId"] == "s1" and rec["n"] == 2
+    assert rec["text"] == "[REDACTED:6chars]"
+
+
+def test_log_json_suppressed_events_and_never_raises(capsys):
+    with patch("app.observability.logging.settings.LOG_SUPPRESSED_EVENTS", "noisy, other"):
+        log_json("noisy", sessionId="s1")
+        log_json("kept", bad={1: object()})
+    out = capsys.readouterr().out
+    assert "noisy" not in out
+    assert json.loads(out)["event"] == "kept"
@@ -1,6 +1,6 @@
 import json
 import time
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, ANY
 import pytest
 from app.store.models import SessionState
 from app.callback.outbox import process_outbox_entry
@@ -73,3 +73,61 @@ def test_outbox_terminal_failure(mock_session):
         
         assert done is True  # Terminal
         assert mock_session.outboxEntry["status"] == "failed:terminal"
+
+def test_calc_backoff_exponential_with_bounded_jitter():
+    from app.callback.outbox import _calc_backoff
+    with patch("app.callback.outbox.settings") as mock_settings:
+        mock_settings.CALLBACK_BASE_DELAY_MS = 1000
+        mock_settings.CALLBACK_MAX_DELAY_MS = 60000
+        for attempt, nominal in ((1, 1000), (2, 2000), (4, 8000)):
+            for _ in range(200):
+                assert nominal * 0.9 <= _calc_backoff(attempt) <= nominal * 1.1
+        assert _calc_backoff(12) == 60000
+
+def test_drain_outbox_enqueues_due_pending_ledgers():
+    from app.callback.outbox import drain_outbox
+    now = int(time.time() * 1000)
+    blobs = {
+        "session:a": json.dumps({"sessionId": "a", "outboxEntry": {"status": "pending", "attempts": 2, "nextAttemptAt": now - 10}}),
+        "session:b": json.dumps({"sessionId": "b", "outboxEntry": {"status": "pending", "attempts": 1, "nextAttemptAt": now + 60000}}),
+        "session:c": json.dumps({"sessionId": "c", "outboxEntry": {"status": "delivered", "attempts": 1}}),
+        "session:d": json.dumps({"sessionId": "d"}),
+        "session:a:last_callback_payload": json.dumps({"sessionId": "a"}),
+    }
+    r = MagicMock()
+    r.scan_iter.return_value = iter(blobs)
+    pipe = r.pipeline.return_value
+    pipe.execute.side_effect = lambda: [blobs[c.args[0]] for c in pipe.get.call_args_list]
+    q = MagicMock()
+    q.connection.hget.return_value = None  # no RQ job under the retry id yet
+    with patch("app.callback.outbox.get_redis", return_value=r), \
+         patch("app.queue.rq_conn.get_queue", return_value=q), \
+         patch("app.callback.outbox.log"):
+        due = drain_outbox(limit=10)
+
+    assert [d["sessionId"] for d in due] == ["a"]
+    assert pipe.get.call_count == 4  # side key skipped, one pipelined batch
+    q.enqueue.assert_called_once()
+    assert q.enqueue.call_args.kwargs["job_id"] == "cb-a-2"
+
+@pytest.mark.parametrize("status,requeued", [
+    (b"scheduled", False), (b"queued", False), (b"started", False), (b"failed", True),
+])
+def test_drain_outbox_skips_retry_job_still_live(status, requeued):
+    from app.callback.outbox import drain_outbox
+    now = int(time.time() * 1000)
+    blobs = {"session:a": json.dumps({"sessionId": "a", "outboxEntry": {"status": "pending", "attempts": 2, "nextAttemptAt": now - 10}})}
+    r = MagicMock()
+    r.scan_iter.return_value = iter(blobs)
+    pipe = r.pipeline.return_value
+    pipe.execute.side_effect = lambda: [blobs[c.args[0]] for c in pipe.get.call_args_list]
+    q = MagicMock()
+    q.connection.hget.return_value = status
+    with patch("app.callback.outbox.get_redis", return_value=r), \
+         patch("app.queue.rq_conn.get_queue", return_value=q), \
+         patch("app.callback.outbox.log"):
+        due = drain_outbox(limit=10)
+
+    q.connection.hget.assert_called_once_with("rq:job:cb-a-2", "status")
+    assert q.enqueue.called is requeued
+    assert [d["sessionId"] for d in due] == (["a"] if requeued else [])
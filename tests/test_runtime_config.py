@@ -70,6 +70,21 @@ def test_maybe_refresh_overrides(mock_get_redis):
         registry._maybe_refresh_overrides()
         assert spec.priority == 0 # default from register()
 
+@patch("app.store.redis_conn.get_redis")
+def test_refresh_interns_intent_map_intents(mock_get_redis):
+    from app.core.broken_flow_constants import INT_ASK_TICKET_REF
+    registry = ArtifactRegistry()
+    with patch("app.settings.settings") as mock_settings:
+        mock_settings.REGISTRY_TTL = 0
+        mock_redis = MagicMock()
+        mock_get_redis.return_value = mock_redis
+        # Only the intent-map key has data
+        im = json.dumps({"caseIds": {"intent": "INT_ASK_TICKET_REF", "instruction": "ask for the ref"}})
+        mock_redis.get.side_effect = lambda key: im if key == mock_settings.REGISTRY_INTENT_MAP_KEY else None
+        registry._maybe_refresh_overrides()
+    assert registry.intent_map["caseIds"]["intent"] is INT_ASK_TICKET_REF
+    assert registry.intent_map["caseIds"]["instruction"] == "ask for the ref"
+
 def test_extract_all_respects_enabled():
     registry = ArtifactRegistry()
     # Mock _maybe_refresh_overrides to do nothing
@@ -0,0 +1,30 @@
+from app.utils.time import compute_engagement_seconds
+
+
+def test_engagement_prefers_wall_clock():
+    assert compute_engagement_seconds([], first_seen_ms=1_000, last_seen_ms=61_000) == 60
+
+
+def test_engagement_first_scammer_to_last_agent():
+    convo = [
+        {"sender": "user", "timestamp": 500},
+        {"sender": "scammer", "timestamp": 1_000},
+        {"sender": "agent", "timestamp": 5_000},
+        {"sender": "scammer", "timestamp": 9_000},
+        {"sender": "agent", "timestamp": 21_000},
+        {"sender": "scammer", "timestamp": 30_000},
+    ]
+    # ints < 10**12 are treated as seconds
+    assert compute_engagement_seconds(convo) == 20_000
+
+
+def test_engagement_falls_back_to_last_message_without_agent():
+    convo = [
+        {"sender": "scammer", "timestamp": "2024-01-01T00:00:00Z"},
+        {"sender": "scammer", "timestamp": "2024-01-01T00:00:42Z"},
+    ]
+    assert compute_engagement_seconds(convo) == 42
+
+
+def test_engagement_zero_without_scammer():
+    assert compute_engagement_seconds([{"sender": "agent", "timestamp": 1_000}]) == 0